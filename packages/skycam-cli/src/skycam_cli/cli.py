@@ -1,15 +1,52 @@
+import builtins
+import functools
+import logging
+import os
+import sys
 import typer
-from rich import print
+from dataclasses import replace
+from pathlib import Path
 from typing import Optional
-from skycam_common.camera import Camera, CameraSettings, CameraNotFoundError, CameraConnectionError
-from skycam_common.template import TemplateManager, ConfigManager, Template
-from skycam_common.exceptions import *
+
+# skycam_common (gphoto2, yaml) is imported inside the commands that use
+# it, so --help and commands like stop start without loading it.
 
 app = typer.Typer(help="Skycam CLI - DSLR camera control for astrophotography")
 
-# Initialize managers
-template_manager = TemplateManager()
-config_manager = ConfigManager()
+@functools.cache
+def _printer():
+    """Pick rich for terminals, and the builtin print for redirected output or NO_COLOR."""
+    if os.environ.get("NO_COLOR") or not sys.stdout.isatty():
+        return builtins.print
+    from rich import print as rich_print
+    return rich_print
+
+def print(*objects, **kwargs) -> None:
+    """Print through the printer chosen for this process, importing rich only if needed."""
+    _printer()(*objects, **kwargs)
+
+@functools.cache
+def _template_manager():
+    """Template manager, created on first use."""
+    from skycam_common.template import TemplateManager
+    return TemplateManager()
+
+@functools.cache
+def _config_manager():
+    """Configuration manager, created on first use."""
+    from skycam_common.template import ConfigManager
+    return ConfigManager()
+
+# Capture configuration summary printed by start(); the output line is optional
+_CONFIG_SUMMARY = ("📸 Capture configuration:\n"
+                   "  Template: %s\n"
+                   "  Exposure: %ss\n"
+                   "  Aperture: f/%s\n"
+                   "  Delay: %ss\n"
+                   "  ISO: %s\n"
+                   "%s"
+                   "  Max exposures: %s")
+_OUTPUT_LINE = "  Output: %s\n"
 
 @app.command()
 def start(
@@ -24,7 +61,15 @@ def start(
     dry_run: Optional[bool] = typer.Option(False, "--dry-run", help="Show what would be done without actually doing it")
 ) -> None:
     """Start a skycam capture session."""
+    from skycam_common.camera import (Camera, CameraSettings, CameraNotFoundError,
+                                      CameraConnectionError, prefetch_cameras)
+    
     print("🚀 Starting skycam capture session...")
+    
+    # Scan for cameras while the template is loaded; detect_cameras() and
+    # connect() below reuse the result
+    if not port and not dry_run:
+        prefetch_cameras()
 
     if dry_run:
         print("🔍 Dry run mode - showing configuration:")
@@ -35,7 +80,7 @@ def start(
     
     if template:
         try:
-            template_obj = template_manager.get_template(template)
+            template_obj = _template_manager().get_template(template)
             settings = template_obj.to_settings()
             template_name = template_obj.name
             print(f"📄 Loaded template: {template_obj.name}")
@@ -50,7 +95,7 @@ def start(
     else:
         # Load default template
         try:
-            template_obj = template_manager.get_template("default")
+            template_obj = _template_manager().get_template("default")
             settings = template_obj.to_settings()
             template_name = template_obj.name
             print(f"📄 Using default template")
@@ -58,26 +103,18 @@ def start(
             print(f"⚠️ Warning: Could not load default template: {e}")
     
     # Override with command line options
-    if exposure:
-        settings.exposure = exposure
-    if aperture:
-        settings.aperture = aperture
-    if delay:
-        settings.delay = delay
-    if iso:
-        settings.iso = iso
+    overrides = {key: value for key, value in
+                 (("exposure", exposure), ("aperture", aperture),
+                  ("delay", delay), ("iso", iso)) if value}
     if max_exposures is not None:
-        settings.max_exposures = max_exposures
+        overrides["max_exposures"] = max_exposures
+    if overrides:
+        settings = replace(settings, **overrides)
     
-    print("📸 Capture configuration:")
-    print(f"  Template: {template_name}")
-    print(f"  Exposure: {settings.exposure}s")
-    print(f"  Aperture: f/{settings.aperture}")
-    print(f"  Delay: {settings.delay}s")
-    print(f"  ISO: {settings.iso}")
-    if output_dir:
-        print(f"  Output: {output_dir}")
-    print(f"  Max exposures: {settings.max_exposures}")
+    print(_CONFIG_SUMMARY % (template_name, settings.exposure, settings.aperture,
+                             settings.delay, settings.iso,
+                             _OUTPUT_LINE % output_dir if output_dir else "",
+                             settings.max_exposures))
     
     if dry_run:
         print("✅ Dry run completed - no actual capture performed")
@@ -107,29 +144,31 @@ def start(
             info = camera.get_camera_info()
             print(f"📊 Camera info: {info}")
             
-            # Validate settings
-            validated_settings, warnings = camera.validate_settings(settings)
+            # Validate settings and configure camera
+            validated_settings, warnings = camera.apply_settings(settings)
             if warnings:
                 print("⚠️ Settings warnings:")
                 for warning in warnings:
                     print(f"  - {warning}")
             
-            # Configure camera
-            config_warnings = camera.configure_camera(validated_settings)
-            if config_warnings:
-                print("⚠️ Configuration warnings:")
-                for warning in config_warnings:
-                    print(f"  - {warning}")
-            
             print("🎯 Starting capture session...")
             print("📸 (Single capture for demo - continuous capture not yet implemented)")
             
-            # Capture single image for now
-            result = camera.capture_single()
+            # Capture single image for now, downloading it when there is somewhere to put it
+            result = camera.capture_single(download=bool(output_dir))
             if result.success:
                 print(f"✅ Capture successful!")
                 print(f"  File: {result.filename}")
                 print(f"  Path: {result.filepath}")
+                if result.data is not None:
+                    try:
+                        saved_path = _save_capture(Path(output_dir), result.filename, result.data)
+                    except OSError as e:
+                        print(f"❌ Could not save image, leaving it on the camera: {e}")
+                    else:
+                        print(f"  Saved: {saved_path}")
+                        if not camera.delete_from_card(result.filepath):
+                            print("⚠️ Image saved but could not be deleted from the camera")
             else:
                 print(f"❌ Capture failed: {result.error_message}")
             
@@ -140,6 +179,30 @@ def start(
     except Exception as e:
         print(f"❌ Unexpected error: {e}")
 
+def _save_capture(directory: Path, filename: str, data) -> Path:
+    """Write a downloaded image into directory without replacing existing files.
+    
+    Camera file counters wrap, so a name that is already taken gets a
+    numeric suffix (IMG_0001-1.CR2, ...) instead.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    stem, suffix = os.path.splitext(filename)
+    counter = 0
+    while True:
+        path = directory / (filename if counter == 0 else f"{stem}-{counter}{suffix}")
+        try:
+            f = open(path, "xb")
+        except FileExistsError:
+            counter += 1
+            continue
+        try:
+            with f:
+                f.write(data)
+        except BaseException:
+            path.unlink(missing_ok=True)  # Don't leave a partial image behind
+            raise
+        return path
+
 @app.command()
 def stop(
     session_id: Optional[str] = typer.Argument(None, help="Session ID to stop (current session if not specified)")
@@ -156,6 +219,8 @@ def stop(
 @app.command()
 def status() -> None:
     """Show current skycam status."""
+    from skycam_common.camera import Camera
+    
     print("📊 Skycam Status:")
     print("  Status: Ready")
 
@@ -182,63 +247,71 @@ templates_app = typer.Typer(help="Template management commands")
 @templates_app.command("list")
 def templates_list() -> None:
     """List all available templates."""
-    print("📋 Available Templates:")
+    lines = ["📋 Available Templates:"]
     
     try:
-        templates = template_manager.list_templates()
+        manager = _template_manager()
+        templates = list(manager.iter_templates())
         if not templates:
-            print("  No templates found")
-            print("  Use 'skycam config init' to create default templates")
+            lines.append("  No templates found")
+            lines.append("  Use 'skycam config init' to create default templates")
         else:
-            for template_name in templates:
+            for template_name, template_path in templates:
                 try:
-                    template = template_manager.load_template(template_name)
-                    desc = template.description or "No description"
-                    print(f"  {template_name:15} - {desc}")
+                    desc = manager.load_description(template_path) or "No description"
+                    lines.append(f"  {template_name:15} - {desc}")
                 except Exception as e:
-                    print(f"  {template_name:15} - Error loading: {e}")
+                    lines.append(f"  {template_name:15} - Error loading: {e}")
     except Exception as e:
-        print(f"  Error listing templates: {e}")
+        lines.append(f"  Error listing templates: {e}")
+    
+    print("\n".join(lines))
+
+# (label, attribute, format) rows shown by templates show, per section
+_CAMERA_FIELDS = (
+    ("Aperture", "aperture", "f/{}"),
+    ("Exposure", "exposure", "{}s"),
+    ("ISO", "iso", "{}"),
+    ("Delay", "delay", "{}s"),
+    ("Quality", "quality", "{}"),
+    ("Max exposures", "max_exposures", "{}"),
+)
+_FILE_FIELDS = (
+    ("Filename pattern", "filename_pattern", "{}"),
+    ("Timestamp format", "timestamp_format", "{}"),
+)
+
+def _field_lines(template, table) -> list:
+    """Format the set fields of a template from one of the field tables."""
+    return [f"    {label}: {fmt.format(value)}" for label, attr, fmt in table
+            if (value := getattr(template, attr)) is not None]
 
 @templates_app.command("show")
 def templates_show(name: str = typer.Argument(..., help="Template name to show")) -> None:
     """Show template details."""
-    print(f"📄 Template: {name}")
+    lines = [f"📄 Template: {name}"]
     
     try:
-        template = template_manager.get_template(name)
-        print(f"  Name: {template.name}")
+        template = _template_manager().get_template(name)
+        lines.append(f"  Name: {template.name}")
         if template.description:
-            print(f"  Description: {template.description}")
-        
-        print("  Camera Settings:")
-        if template.aperture:
-            print(f"    Aperture: f/{template.aperture}")
-        if template.exposure:
-            print(f"    Exposure: {template.exposure}s")
-        if template.iso:
-            print(f"    ISO: {template.iso}")
-        if template.delay:
-            print(f"    Delay: {template.delay}s")
-        if template.quality:
-            print(f"    Quality: {template.quality}")
-        if template.max_exposures is not None:
-            print(f"    Max exposures: {template.max_exposures}")
+            lines.append(f"  Description: {template.description}")
         
-        print("  File Settings:")
-        if template.filename_pattern:
-            print(f"    Filename pattern: {template.filename_pattern}")
-        if template.timestamp_format:
-            print(f"    Timestamp format: {template.timestamp_format}")
+        lines.append("  Camera Settings:")
+        lines.extend(_field_lines(template, _CAMERA_FIELDS))
+        lines.append("  File Settings:")
+        lines.extend(_field_lines(template, _FILE_FIELDS))
         
         if template.temperature_monitoring:
-            print("  Session Settings:")
-            print(f"    Temperature monitoring: {template.temperature_monitoring}")
+            lines.append("  Session Settings:")
+            lines.append(f"    Temperature monitoring: {template.temperature_monitoring}")
             
     except FileNotFoundError:
-        print(f"❌ Template '{name}' not found")
+        lines.append(f"❌ Template '{name}' not found")
     except Exception as e:
-        print(f"❌ Error loading template: {e}")
+        lines.append(f"❌ Error loading template: {e}")
+    
+    print("\n".join(lines))
 
 # Configuration subcommand group
 config_app = typer.Typer(help="Configuration management commands")
@@ -250,14 +323,14 @@ def config_init() -> None:
     
     try:
         # Initialize configuration
-        config = config_manager.load_config()
+        config = _config_manager().load_config()
         
         # Ensure default template exists
-        template_manager.ensure_default_template()
+        _template_manager().ensure_default_template()
         
         print("✅ Configuration initialized successfully!")
-        print(f"  Config file: {config_manager.config_file}")
-        print(f"  Templates directory: {template_manager.templates_dir}")
+        print(f"  Config file: {_config_manager().config_file}")
+        print(f"  Templates directory: {_template_manager().templates_dir}")
         print(f"  Default template: {config['default_template']}")
         
     except Exception as e:
@@ -266,20 +339,124 @@ def config_init() -> None:
 @config_app.command("show")
 def config_show() -> None:
     """Show current configuration."""
-    print("⚙️  Current Configuration:")
+    lines = ["⚙️  Current Configuration:"]
     
     try:
-        config = config_manager.load_config()
-        
-        for key, value in config.items():
-            print(f"  {key}: {value}")
-            
+        config = _config_manager().load_config()
+        lines.extend(f"  {key}: {value}" for key, value in config.items())
+    except Exception as e:
+        lines.append(f"❌ Error loading configuration: {e}")
+    
+    print("\n".join(lines))
+
+@config_app.command("migrate")
+def config_migrate() -> None:
+    """Convert YAML templates to TOML, which loads much faster."""
+    print("🔄 Migrating templates to TOML...")
+    
+    try:
+        migrated = _template_manager().migrate_to_toml()
     except Exception as e:
-        print(f"❌ Error loading configuration: {e}")
+        print(f"❌ Error migrating templates: {e}")
+        return
+    
+    if not migrated:
+        print("✅ No YAML templates to migrate")
+        return
+    
+    lines = [f"✅ Migrated {len(migrated)} template(s):"]
+    lines.extend(f"  - {name}" for name in migrated)
+    print("\n".join(lines))
 
 # Add subcommands to main app
 app.add_typer(templates_app, name="templates")
 app.add_typer(config_app, name="config")
 
+# Rendered top-level --help, replayed instead of rendering it again with rich
+_HELP_CACHE_PATH = Path.home() / ".config" / "skycam" / "cache" / "help.txt"
+
+class _Tee:
+    """Stream wrapper that keeps a copy of everything written through it."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+        self.parts = []
+    
+    def write(self, text: str) -> int:
+        if isinstance(text, str):  # click may flush an empty bytes write
+            self.parts.append(text)
+        return self._stream.write(text)
+    
+    def __getattr__(self, name):
+        # isatty(), fileno() etc. come from the real stream, so rich
+        # renders exactly as it would without the wrapper
+        return getattr(self._stream, name)
+
+def _package_version(name: str) -> str:
+    """Return an installed package's version, or "" if it isn't installed."""
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return ""
+
+def _help_cache_key() -> str:
+    """Describe everything the rendered help depends on."""
+    stat = os.stat(__file__)
+    env = "|".join(os.environ.get(name, "") for name in ("NO_COLOR", "FORCE_COLOR", "TERM", "COLUMNS"))
+    versions = "|".join(_package_version(name) for name in ("typer", "click", "rich"))
+    return (f"{stat.st_mtime_ns}|{stat.st_size}|{sys.stdout.isatty()}|"
+            f"{os.get_terminal_size().columns if sys.stdout.isatty() else 0}|{env}|{versions}")
+
+def _run_help(key: str) -> None:
+    """Show the top-level help, from the cache when it was rendered for this key."""
+    try:
+        cached_key, _, text = _HELP_CACHE_PATH.read_text(encoding="utf-8").partition("\n")
+        if cached_key == key:
+            sys.stdout.write(text)
+            return
+    except (OSError, UnicodeDecodeError):
+        pass  # Missing or corrupt cache, render it live
+    
+    tee = sys.stdout = _Tee(sys.stdout)
+    try:
+        app()
+    except SystemExit as e:
+        if e.code:
+            raise
+    finally:
+        sys.stdout = tee._stream
+    
+    try:
+        _HELP_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _HELP_CACHE_PATH.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(f"{key}\n{''.join(tee.parts)}", encoding="utf-8")
+        os.replace(tmp_path, _HELP_CACHE_PATH)
+    except OSError:
+        pass  # Caching is best effort
+
+class _LogFormatter(logging.Formatter):
+    """Format log records like the CLI's own output: warnings and errors get a "Warning: " style prefix."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname.capitalize()}: {message}"
+        return message
+
+def _setup_logging() -> None:
+    """Print skycam_common's camera messages to stdout, the way the old prints did."""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(_LogFormatter())
+    common_logger = logging.getLogger("skycam_common")
+    common_logger.addHandler(handler)
+    common_logger.setLevel(logging.INFO)
+    common_logger.propagate = False
+
 def main() -> None:
+    if sys.argv[1:] == ["--help"]:
+        _run_help(_help_cache_key())
+        return
+    
+    _setup_logging()
     app()
@@ -0,0 +1,202 @@
+"""Tests for the skycam CLI."""
+
+import pytest
+from unittest.mock import MagicMock
+from typer.testing import CliRunner
+
+# Import the modules we're testing
+from skycam_cli import cli
+import skycam_common.camera as camera_module
+from skycam_common.camera import CameraSettings, CaptureResult
+from skycam_common.template import TemplateManager
+
+
+runner = CliRunner()
+
+
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    """Make every test parse template files afresh."""
+    TemplateManager.clear_cache()
+
+
+@pytest.fixture
+def templates_dir(monkeypatch, tmp_path):
+    """Point the CLI's template manager at a temporary templates directory."""
+    manager = TemplateManager(templates_dir=tmp_path)
+    monkeypatch.setattr(cli, "_template_manager", lambda: manager)
+    return tmp_path
+
+
+class TestSaveCapture:
+    """Test saving downloaded images on the host."""
+    
+    def test_save_capture(self, tmp_path):
+        """Test an image is written under its camera filename, creating the directory."""
+        path = cli._save_capture(tmp_path / "out", "IMG_0001.CR2", memoryview(b"raw"))
+        
+        assert path == tmp_path / "out" / "IMG_0001.CR2"
+        assert path.read_bytes() == b"raw"
+    
+    def test_save_capture_name_taken(self, tmp_path):
+        """Test existing files are kept and the image gets a numeric suffix."""
+        (tmp_path / "IMG_0001.CR2").write_bytes(b"first")
+        (tmp_path / "IMG_0001-1.CR2").write_bytes(b"second")
+        
+        path = cli._save_capture(tmp_path, "IMG_0001.CR2", b"third")
+        
+        assert path == tmp_path / "IMG_0001-2.CR2"
+        assert path.read_bytes() == b"third"
+        assert (tmp_path / "IMG_0001.CR2").read_bytes() == b"first"
+        assert (tmp_path / "IMG_0001-1.CR2").read_bytes() == b"second"
+    
+    def test_save_capture_write_failure(self, tmp_path):
+        """Test a failed write leaves no partial file behind."""
+        with pytest.raises(TypeError):
+            cli._save_capture(tmp_path, "IMG_0001.CR2", object())
+        
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestStartDownload:
+    """Test start saves a downloaded capture before deleting it from the camera."""
+    
+    @pytest.fixture
+    def camera(self, monkeypatch, templates_dir):
+        """Replace the Camera class used by start with a mock that captures one image."""
+        camera = MagicMock()
+        camera.__enter__.return_value = camera
+        camera.get_camera_info.return_value = {}
+        camera.apply_settings.return_value = (CameraSettings(), [])
+        camera.capture_single.return_value = CaptureResult(
+            success=True, filename="IMG_0001.CR2", filepath="/store_00010001/DCIM/IMG_0001.CR2",
+            data=memoryview(b"raw"))
+        monkeypatch.setattr(camera_module, "Camera", MagicMock(return_value=camera))
+        return camera
+    
+    def test_saved_then_deleted(self, camera, tmp_path):
+        """Test the card copy is deleted only once the image is on the host."""
+        output_dir = tmp_path / "out"
+        camera.delete_from_card.side_effect = lambda filepath: (output_dir / "IMG_0001.CR2").exists()
+        
+        result = runner.invoke(cli.app, ["start", "--port", "usb:001,002", "--output-dir", str(output_dir)])
+        
+        assert result.exit_code == 0
+        camera.capture_single.assert_called_once_with(download=True)
+        camera.delete_from_card.assert_called_once_with("/store_00010001/DCIM/IMG_0001.CR2")
+        assert (output_dir / "IMG_0001.CR2").read_bytes() == b"raw"
+        assert "Saved:" in result.output
+        assert "could not be deleted" not in result.output
+    
+    def test_save_failure_keeps_card_copy(self, camera, tmp_path):
+        """Test an image that couldn't be saved stays on the camera."""
+        output_dir = tmp_path / "out"
+        output_dir.write_text("not a directory")
+        
+        result = runner.invoke(cli.app, ["start", "--port", "usb:001,002", "--output-dir", str(output_dir)])
+        
+        assert "Could not save image, leaving it on the camera" in result.output
+        camera.delete_from_card.assert_not_called()
+    
+    def test_no_output_dir(self, camera):
+        """Test nothing is downloaded or deleted without an output directory."""
+        camera.capture_single.return_value = CaptureResult(
+            success=True, filename="IMG_0001.CR2", filepath="/store_00010001/DCIM/IMG_0001.CR2")
+        
+        result = runner.invoke(cli.app, ["start", "--port", "usb:001,002"])
+        
+        assert "Capture successful" in result.output
+        camera.capture_single.assert_called_once_with(download=False)
+        camera.delete_from_card.assert_not_called()
+
+
+class TestConfigMigrate:
+    """Test the config migrate command."""
+    
+    def test_migrate(self, templates_dir):
+        """Test every YAML template is converted and later listings show the TOML files."""
+        (templates_dir / "moon.yml").write_text("exposure: 0.5\n")
+        (templates_dir / "stars.yml").write_text("exposure: 20.0\niso: '1600'\n")
+        manager = cli._template_manager()
+        assert manager.list_templates() == ["moon", "stars"]  # Caches the listing
+        
+        result = runner.invoke(cli.app, ["config", "migrate"])
+        
+        assert result.exit_code == 0
+        assert "Migrated 2 template(s)" in result.output
+        assert sorted(p.name for p in templates_dir.iterdir()) == ["moon.toml", "stars.toml"]
+        assert list(manager.iter_templates()) == [
+            ("moon", str(templates_dir / "moon.toml")),
+            ("stars", str(templates_dir / "stars.toml")),
+        ]
+        assert manager.load_template("stars").iso == "1600"
+    
+    def test_migrate_invalid_template(self, templates_dir):
+        """Test nothing is written when one template can't be converted."""
+        (templates_dir / "moon.yml").write_text("exposure: 0.5\n")
+        (templates_dir / "broken.yml").write_text("exposure: [0.5\n")
+        
+        result = runner.invoke(cli.app, ["config", "migrate"])
+        
+        assert result.exit_code == 0
+        assert "Error migrating templates" in result.output
+        assert not list(templates_dir.glob("*.toml"))
+        assert (templates_dir / "moon.yml").exists()
+    
+    def test_migrate_nothing(self, templates_dir):
+        """Test a directory without YAML templates is reported as such."""
+        result = runner.invoke(cli.app, ["config", "migrate"])
+        
+        assert "No YAML templates to migrate" in result.output
+
+
+class TestHelpCache:
+    """Test the cached top-level --help."""
+    
+    @pytest.fixture
+    def help_cache(self, monkeypatch, tmp_path):
+        """Run main() as `skycam --help` with the help cache in a temporary directory."""
+        cache_path = tmp_path / "help.txt"
+        monkeypatch.setattr(cli, "_HELP_CACHE_PATH", cache_path)
+        monkeypatch.setattr(cli.sys, "argv", ["skycam", "--help"])
+        return cache_path
+    
+    def test_miss_renders_and_caches(self, help_cache, capsys):
+        """Test the help is rendered live and stored under its key."""
+        cli.main()
+        
+        output = capsys.readouterr().out
+        assert "Usage:" in output
+        key, _, text = help_cache.read_text(encoding="utf-8").partition("\n")
+        assert key == cli._help_cache_key()
+        assert text == output
+    
+    def test_hit_replays_cache(self, help_cache, capsys, monkeypatch):
+        """Test a cache rendered for the same key is replayed without running the app."""
+        help_cache.write_text(f"{cli._help_cache_key()}\ncached help\n", encoding="utf-8")
+        monkeypatch.setattr(cli, "app", lambda: pytest.fail("help rendered live"))
+        
+        cli.main()
+        
+        assert capsys.readouterr().out == "cached help\n"
+    
+    @pytest.mark.parametrize("content", [
+        "stale-key\ncached help\n".encode(),
+        b"\xff\xfe not utf-8",
+    ])
+    def test_stale_or_corrupt_cache_rerenders(self, help_cache, capsys, content):
+        """Test a cache for another key, or one that can't be decoded, is rendered again."""
+        help_cache.write_bytes(content)
+        
+        cli.main()
+        
+        output = capsys.readouterr().out
+        assert "Usage:" in output
+        assert help_cache.read_text(encoding="utf-8") == f"{cli._help_cache_key()}\n{output}"
+    
+    def test_key_includes_package_versions(self, monkeypatch):
+        """Test upgrading typer, click or rich changes the key."""
+        key = cli._help_cache_key()
+        monkeypatch.setattr(cli, "_package_version", lambda name: "99.0" if name == "rich" else "")
+        
+        assert cli._help_cache_key() != key
@@ -3,19 +3,34 @@
 This module provides camera control functionality using gphoto2 bindings.
 """
 
+import atexit
+import bisect
+import json
+import logging
+import os
+import re
+import threading
 import time
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple, Any
+from dataclasses import dataclass, field, replace
 
 try:
     import gphoto2 as gp
 except ImportError:
     gp = None
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class CameraSettings:
-    """Camera settings configuration."""
+    """Camera settings configuration.
+    
+    Frozen so instances can be shared and hashed; use ``dataclasses.replace``
+    to derive modified settings.
+    """
     exposure: float = 8.0
     aperture: float = 1.4
     iso: str = "auto"
@@ -24,23 +39,44 @@ class CameraSettings:
     max_exposures: int = 0  # 0 = unlimited
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class CameraCapabilities:
-    """Camera capabilities and available settings."""
-    exposure_times: List[float]
-    apertures: List[float]
-    iso_values: List[str]
+    """Camera capabilities and available settings.
+    
+    Instances are immutable once built: the choices are stored as tuples
+    (any sequence is accepted), so the derived lookup sets below always
+    match them and instances can be hashed.
+    """
+    exposure_times: Sequence[float]
+    apertures: Sequence[float]
+    iso_values: Sequence[str]
     has_live_view: bool = True
     supports_bulb_mode: bool = False
+    
+    # Membership lookups, derived from the lists above
+    _exposure_set: FrozenSet[float] = field(init=False, repr=False, compare=False)
+    _aperture_set: FrozenSet[float] = field(init=False, repr=False, compare=False)
+    _iso_set: FrozenSet[str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Keep numeric choices sorted so closest-value lookups can bisect.
+        set_ = object.__setattr__
+        set_(self, 'exposure_times', tuple(sorted(self.exposure_times)))
+        set_(self, 'apertures', tuple(sorted(self.apertures)))
+        set_(self, 'iso_values', tuple(self.iso_values))
+        set_(self, '_exposure_set', frozenset(self.exposure_times))
+        set_(self, '_aperture_set', frozenset(self.apertures))
+        set_(self, '_iso_set', frozenset(self.iso_values))
 
 
-@dataclass
+@dataclass(slots=True)
 class CaptureResult:
     """Result from a camera capture operation."""
     success: bool
     filename: Optional[str] = None
     filepath: Optional[str] = None
     error_message: Optional[str] = None
+    data: Optional[memoryview] = None  # Image contents when downloaded to the host
 
 
 class CameraError(Exception):
@@ -58,14 +94,183 @@ class CameraConnectionError(CameraError):
     pass
 
 
+# Shutter speeds come as "30s", "0.5s" or fractions like "1/250s" (the
+# trailing "s" is omitted by some cameras); apertures as "f/2.8" or "2.8".
+_SHUTTER_RE = re.compile(r'^(\d+(?:\.\d+)?)(?:/(\d+))?\s*s?$')
+_APERTURE_RE = re.compile(r'^(?:f/)?(\d+(?:\.\d+)?)$')
+
+
+def _parse_shutter(choice: str) -> Optional[float]:
+    """Parse a shutterspeed choice into seconds, or None if unrecognized."""
+    match = _SHUTTER_RE.match(choice)
+    if match is None:
+        return None
+    numerator, denominator = match.groups()
+    if denominator is None:
+        return float(numerator)
+    if int(denominator) == 0:
+        return None
+    return float(numerator) / int(denominator)
+
+
+def _parse_aperture(choice: str) -> Optional[float]:
+    """Parse an f-number choice, or None if unrecognized."""
+    match = _APERTURE_RE.match(choice)
+    return float(match.group(1)) if match else None
+
+
+def _parse_choices(choices: List[str], parse: Callable[[str], Optional[float]]) -> Tuple[List[float], List[str]]:
+    """Parse a widget's choices in one pass.
+    
+    Args:
+        choices: Choices of a gphoto2 radio/menu widget, in widget order
+        parse: Parser returning the numeric value of a choice, or None to skip it
+        
+    Returns:
+        Tuple of (sorted values, widget choice string for each value)
+    """
+    parsed = []
+    for choice in choices:
+        value = parse(choice or '')
+        if value is not None:
+            parsed.append((value, choice))
+    parsed.sort()
+    return [value for value, _ in parsed], [choice for _, choice in parsed]
+
+
+def _quality_choice(widget, quality: str) -> str:
+    """Return the imagequality choice matching a quality name such as "raw".
+    
+    An exact (case-insensitive) match is preferred, then the first choice
+    containing the name, e.g. "RAW" or "NEF (Raw)".
+    
+    Raises:
+        CameraError: If no choice matches
+    """
+    choices = [choice for choice in widget.get_choices() if choice]
+    wanted = quality.lower()
+    for choice in choices:
+        if choice.lower() == wanted:
+            return choice
+    for choice in choices:
+        if wanted in choice.lower():
+            return choice
+    raise CameraError(f"no {quality} choice available")
+
+
+def _closest_position(sorted_values: List[float], target: float) -> int:
+    """Return the position of the value closest to target in a sorted list."""
+    i = bisect.bisect_left(sorted_values, target)
+    if i == 0:
+        return 0
+    if i == len(sorted_values):
+        return len(sorted_values) - 1
+    if abs(sorted_values[i - 1] - target) <= abs(sorted_values[i] - target):
+        return i - 1
+    return i
+
+
+def closest_sorted(sorted_values: List[float], target: float) -> float:
+    """Return the value closest to target in a sorted list.
+    
+    Args:
+        sorted_values: Non-empty list of values in ascending order
+        target: Value to match
+        
+    Returns:
+        The closest value; ties go to the smaller one
+    """
+    return sorted_values[_closest_position(sorted_values, target)]
+
+
+# autodetect() probes every USB port, so results are reused for a short
+# while between detect_cameras() and connect() calls. Concurrent callers
+# wait for a scan in progress rather than starting their own.
+_AUTODETECT_TTL = 3.0
+_AUTODETECT_CACHE: Optional[Tuple[float, List[Tuple[str, str]]]] = None
+_AUTODETECT_LOCK = threading.Lock()
+
+
+def _cached_autodetect() -> List[Tuple[str, str]]:
+    """Return (port, name) pairs from autodetect(), cached for _AUTODETECT_TTL seconds."""
+    global _AUTODETECT_CACHE
+    with _AUTODETECT_LOCK:
+        now = time.monotonic()
+        if _AUTODETECT_CACHE is not None and now - _AUTODETECT_CACHE[0] < _AUTODETECT_TTL:
+            return _AUTODETECT_CACHE[1]
+        result = list(gp.camera.Camera.autodetect() or [])
+        _AUTODETECT_CACHE = (time.monotonic(), result)
+        return result
+
+
+def prefetch_cameras() -> Optional[threading.Thread]:
+    """Start scanning for cameras in the background.
+    
+    The result lands in the autodetect cache, so a detect_cameras() or
+    connect() call made soon after doesn't have to wait for a full scan.
+    
+    Returns:
+        The scanning thread, or None if gphoto2 is not available
+    """
+    if gp is None:
+        return None
+    
+    def scan():
+        try:
+            _cached_autodetect()
+        except Exception as e:
+            logger.debug("Background camera scan failed: %s", e)
+    
+    thread = threading.Thread(target=scan, name="skycam-detect", daemon=True)
+    thread.start()
+    return thread
+
+
+# A model's choice lists do not change between connections, so parsed
+# capabilities are kept on disk keyed by camera model and libgphoto2 version.
+_CAPS_CACHE_PATH = Path.home() / ".config" / "skycam" / "cache" / "camera-caps.json"
+_CAPS_CACHE_MAX_AGE = 30 * 24 * 60 * 60  # seconds
+
+
+def _read_caps_cache() -> Dict[str, Dict[str, Any]]:
+    """Read all entries from the capabilities cache file."""
+    try:
+        with open(_CAPS_CACHE_PATH, 'rb') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_caps_cache(key: str, entry: Dict[str, Any]) -> None:
+    """Add or replace one entry in the capabilities cache file."""
+    entries = _read_caps_cache()
+    entries[key] = entry
+    try:
+        _CAPS_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _CAPS_CACHE_PATH.with_name(_CAPS_CACHE_PATH.name + ".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, _CAPS_CACHE_PATH)
+    except OSError as e:
+        logger.debug("Could not write capabilities cache: %s", e)
+
+
 class Camera:
     """Main camera control class."""
     
-    def __init__(self, port: Optional[str] = None):
+    def __init__(self, port: Optional[str] = None, keepalive_interval: Optional[float] = None,
+                 trigger_before_capture: bool = False):
         """Initialize camera control.
         
         Args:
             port: Camera port (None for auto-detection)
+            keepalive_interval: Seconds between keepalive pings while connected
+                (None to disable). Keeps cameras that power off when idle,
+                such as many Canons, from dropping the connection.
+            trigger_before_capture: Call trigger_capture() before capture().
+                capture() fires the shutter on its own for most cameras, so
+                the extra round trip is only made for bodies that need it.
         """
         if gp is None:
             raise ImportError("gphoto2 library not available. Install with: pip install gphoto2")
@@ -73,8 +278,44 @@ class Camera:
         self.port = port
         self.camera = None
         self.connected = False
+        self.keep_alive = False  # When True, leaving a with-block keeps the connection open
+        # libgphoto2 is not thread-safe on a single handle, so every call on
+        # self.camera is serialized through this lock. It is re-entrant so
+        # locked methods can call each other (connect -> _query_capabilities).
+        self._camera_lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.keepalive_interval = keepalive_interval
+        self._needs_trigger = trigger_before_capture
+        self._keepalive: Optional[threading.Thread] = None
+        self._stop_keepalive = threading.Event()
         self.capabilities: Optional[CameraCapabilities] = None
         self.current_settings = CameraSettings()
+        self._reset_choice_cache()
+    
+    def _reset_choice_cache(self) -> None:
+        """Drop cached config widgets and parsed choices."""
+        # Parsed choice values are kept sorted, with the widget choice string
+        # to set for each at the same position in the parallel names list.
+        # The raw widget choices are what the capabilities cache stores.
+        self._shutter_widget = None
+        self._shutter_choices: List[str] = []
+        self._shutter_values: List[float] = []
+        self._shutter_names: List[str] = []
+        self._aperture_widget = None
+        self._aperture_choices: List[str] = []
+        self._aperture_values: List[float] = []
+        self._aperture_names: List[str] = []
+        # Set when the choices above were restored from the capabilities
+        # cache and have not been compared with the camera's widgets yet
+        self._choices_unverified = False
+        self._iso_widget = None
+        self._quality_widget = None
+        # Root of the config tree the widgets above belong to; changes made
+        # to the widgets are written back with one set_config() call.
+        self._config_root = None
+        # Setting values the camera was last configured with, by field
+        # name; a setting whose write failed is left out so it is retried
+        self._last_applied: Dict[str, Any] = {}
         
     def detect_cameras(self) -> List[str]:
         """Detect available cameras.
@@ -83,13 +324,9 @@ class Camera:
             List of camera port strings
         """
         try:
-            camera_list = gp.camera.Camera.autodetect()
-            if camera_list is None:
-                return []
-            
-            return [port for port, name in camera_list]
+            return [port for port, name in _cached_autodetect()]
         except Exception as e:
-            print(f"Warning: Could not detect cameras: {e}")
+            logger.warning("Could not detect cameras: %s", e)
             return []
     
     def connect(self, auto_detect: bool = True) -> None:
@@ -102,242 +339,560 @@ class Camera:
             CameraNotFoundError: If no camera found
             CameraConnectionError: If connection fails
         """
-        try:
-            if auto_detect and self.port is None:
-                # Auto-detect camera
-                camera_list = gp.camera.Camera.autodetect()
-                if camera_list is None or len(camera_list) == 0:
-                    raise CameraNotFoundError("No cameras detected")
-                
-                # Use first available camera
-                self.port = camera_list[0][0]
-                print(f"Auto-detected camera: {camera_list[0][1]} on port {self.port}")
-            
-            # Create camera instance
-            self.camera = gp.Camera()
-            
-            if self.port:
-                self.camera.init()
-                self.connected = True
-                print(f"Connected to camera on port: {self.port}")
+        with self._camera_lock:
+            try:
+                if auto_detect and self.port is None:
+                    # Auto-detect camera
+                    camera_list = _cached_autodetect()
+                    if len(camera_list) == 0:
+                        raise CameraNotFoundError("No cameras detected")
+                    
+                    # Use first available camera
+                    self.port = camera_list[0][0]
+                    logger.info("Auto-detected camera: %s on port %s", camera_list[0][1], self.port)
                 
-                # Query capabilities
-                self._query_capabilities()
+                # Reconnecting: close the old handle and drop the widgets and
+                # applied settings that belong to its session
+                if self.camera is not None:
+                    try:
+                        self.camera.exit()
+                    except Exception as e:
+                        logger.debug("Error closing previous camera handle: %s", e)
+                    self.connected = False
+                self._reset_choice_cache()
                 
-            else:
-                raise CameraConnectionError("No port specified and auto-detection failed")
+                # Create camera instance
+                self.camera = gp.Camera()
                 
-        except gp.GPhoto2Error as e:
-            if e.code == gp.GP_ERROR_MODEL_NOT_FOUND:
-                raise CameraNotFoundError(f"Camera not found on port {self.port}")
-            else:
-                raise CameraConnectionError(f"Failed to connect to camera: {e}")
-        except Exception as e:
-            raise CameraConnectionError(f"Unexpected error connecting to camera: {e}")
+                if self.port:
+                    self.camera.init()
+                    self.connected = True
+                    logger.info("Connected to camera on port: %s", self.port)
+                    
+                    # Query capabilities
+                    self._query_capabilities()
+                    
+                    if self.keepalive_interval:
+                        self._start_keepalive()
+                    
+                else:
+                    raise CameraConnectionError("No port specified and auto-detection failed")
+                    
+            except gp.GPhoto2Error as e:
+                if e.code == gp.GP_ERROR_MODEL_NOT_FOUND:
+                    raise CameraNotFoundError(f"Camera not found on port {self.port}")
+                else:
+                    raise CameraConnectionError(f"Failed to connect to camera: {e}")
+            except Exception as e:
+                raise CameraConnectionError(f"Unexpected error connecting to camera: {e}")
+    
+    def ensure_connected(self) -> None:
+        """Connect to the camera unless already connected."""
+        if not self.connected:
+            self.connect()
     
     def _query_capabilities(self) -> None:
         """Query camera capabilities and available settings."""
-        try:
-            # Get exposure times
-            exposure_times = []
-            try:
-                exposure_config = self.camera.get_config('shutterspeed')
-                choice_count = exposure_config.get_count()
-                for i in range(choice_count):
-                    choice = exposure_config.get_choice(i)
-                    if choice and 's' in choice:
-                        # Extract numeric value
-                        value = float(choice.replace('s', ''))
-                        exposure_times.append(value)
-            except Exception:
-                exposure_times = [0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0]  # Default values
+        with self._camera_lock:
+            cache_key = self._caps_cache_key()
+            if cache_key is not None and self._load_cached_capabilities(cache_key):
+                logger.info("Using cached capabilities for %s", cache_key)
+                return
             
-            # Get apertures
-            apertures = []
             try:
-                aperture_config = self.camera.get_config('f-number')
-                choice_count = aperture_config.get_count()
-                for i in range(choice_count):
-                    choice = aperture_config.get_choice(i)
-                    if choice and 'f/' in choice:
-                        # Extract numeric value
-                        value = float(choice.replace('f/', ''))
-                        apertures.append(value)
-            except Exception:
-                apertures = [1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11.0, 16.0]  # Default values
-            
-            # Get ISO values
-            iso_values = []
+                # Fetch the whole config tree once and read the widgets from it
+                self._load_widgets()
+                
+                # Get exposure times
+                exposure_times = []
+                try:
+                    if self._shutter_widget is not None:
+                        self._shutter_choices = list(self._shutter_widget.get_choices())
+                        self._shutter_values, self._shutter_names = _parse_choices(self._shutter_choices, _parse_shutter)
+                        exposure_times = list(self._shutter_values)
+                except (gp.GPhoto2Error, ValueError) as e:
+                    logger.warning("Could not read shutterspeed choices: %s", e)
+                
+                # Get apertures
+                apertures = []
+                try:
+                    if self._aperture_widget is not None:
+                        self._aperture_choices = list(self._aperture_widget.get_choices())
+                        self._aperture_values, self._aperture_names = _parse_choices(self._aperture_choices, _parse_aperture)
+                        apertures = list(self._aperture_values)
+                except (gp.GPhoto2Error, ValueError) as e:
+                    logger.warning("Could not read f-number choices: %s", e)
+                
+                # Get ISO values
+                iso_values = []
+                try:
+                    if self._iso_widget is not None:
+                        iso_values = [choice for choice in self._iso_widget.get_choices() if choice]
+                except (gp.GPhoto2Error, ValueError) as e:
+                    logger.warning("Could not read iso choices: %s", e)
+                
+                # Only cache a complete reading, not one padded with defaults
+                complete = bool(exposure_times and apertures and iso_values)
+                if not exposure_times:
+                    exposure_times = [0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0]  # Default values
+                if not apertures:
+                    apertures = [1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11.0, 16.0]  # Default values
+                if not iso_values:
+                    iso_values = ["auto", "100", "200", "400", "800", "1600", "3200", "6400"]  # Default values
+                
+                self.capabilities = CameraCapabilities(
+                    exposure_times=exposure_times,
+                    apertures=apertures,
+                    iso_values=iso_values
+                )
+                
+                logger.info("Camera capabilities detected: %d exposure times, %d apertures, %d ISO values",
+                            len(exposure_times), len(apertures), len(iso_values))
+                
+                if complete and cache_key is not None:
+                    self._save_cached_capabilities(cache_key)
+                
+            except Exception as e:
+                logger.warning("Could not query camera capabilities: %s", e)
+                # Use default capabilities
+                self.capabilities = CameraCapabilities(
+                    exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0],
+                    apertures=[1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11.0, 16.0],
+                    iso_values=["auto", "100", "200", "400", "800", "1600", "3200", "6400"]
+                )
+    
+    def _load_widgets(self) -> None:
+        """Fetch the config tree and look up the widgets used to configure the camera."""
+        root = self.camera.get_config()
+        self._config_root = root
+        for attr, name in (('_shutter_widget', 'shutterspeed'),
+                           ('_aperture_widget', 'f-number'),
+                           ('_iso_widget', 'iso'),
+                           ('_quality_widget', 'imagequality')):
             try:
-                iso_config = self.camera.get_config('iso')
-                choice_count = iso_config.get_count()
-                for i in range(choice_count):
-                    choice = iso_config.get_choice(i)
-                    if choice:
-                        iso_values.append(choice)
-            except Exception:
-                iso_values = ["auto", "100", "200", "400", "800", "1600", "3200", "6400"]  # Default values
-            
-            self.capabilities = CameraCapabilities(
-                exposure_times=sorted(exposure_times),
-                apertures=sorted(apertures),
-                iso_values=iso_values
+                setattr(self, attr, root.get_child_by_name(name))
+            except (gp.GPhoto2Error, KeyError) as e:
+                logger.warning("No %s widget: %s", name, e)
+        
+        if self._choices_unverified:
+            self._choices_unverified = False
+            self._verify_cached_choices()
+    
+    def _verify_cached_choices(self) -> None:
+        """Re-parse cached choices that no longer match the camera's widgets.
+        
+        A firmware update or a change of shooting mode can change a widget's
+        choices, which would leave cached choices the camera no longer offers.
+        The widgets come from the config tree already fetched, so reading
+        their choices doesn't touch the camera.
+        """
+        stale = False
+        try:
+            if self._shutter_widget is not None:
+                choices = list(self._shutter_widget.get_choices())
+                if choices != self._shutter_choices:
+                    self._shutter_choices = choices
+                    self._shutter_values, self._shutter_names = _parse_choices(choices, _parse_shutter)
+                    stale = True
+            if self._aperture_widget is not None:
+                choices = list(self._aperture_widget.get_choices())
+                if choices != self._aperture_choices:
+                    self._aperture_choices = choices
+                    self._aperture_values, self._aperture_names = _parse_choices(choices, _parse_aperture)
+                    stale = True
+        except (gp.GPhoto2Error, ValueError) as e:
+            logger.warning("Could not check cached choices: %s", e)
+            return
+        
+        if not stale:
+            return
+        logger.info("Camera choices changed since they were cached, re-reading them")
+        if self.capabilities is not None:
+            self.capabilities = replace(
+                self.capabilities,
+                exposure_times=list(self._shutter_values) or self.capabilities.exposure_times,
+                apertures=list(self._aperture_values) or self.capabilities.apertures,
             )
+        cache_key = self._caps_cache_key()
+        if cache_key is not None:
+            self._save_cached_capabilities(cache_key)
+    
+    def _ensure_widgets(self) -> None:
+        """Load the config widgets if capabilities came from the cache.
+        
+        Called before choosing positions in the parsed choices, so cached
+        choices are checked against the camera first. Failures are left for
+        _write_config() to report.
+        """
+        if self._config_root is not None:
+            return
+        try:
+            self._load_widgets()
+        except Exception as e:
+            logger.debug("Could not load camera widgets: %s", e)
+    
+    def _caps_cache_key(self) -> Optional[str]:
+        """Return the capabilities cache key for the connected camera.
+        
+        Returns:
+            "<model>|<libgphoto2 version>", or None if the camera can't be identified
+        """
+        try:
+            model = self.camera.get_abilities().model
+            version = gp.gp_library_version(gp.GP_VERSION_SHORT)[0]
+        except Exception as e:
+            logger.debug("Could not identify camera for capabilities cache: %s", e)
+            return None
+        return f"{model}|{version}"
+    
+    def _load_cached_capabilities(self, key: str) -> bool:
+        """Restore capabilities and parsed choices from the on-disk cache.
+        
+        Widgets are not fetched; _write_config() loads them on first use.
+        
+        Args:
+            key: Cache key from _caps_cache_key()
             
-            print(f"Camera capabilities detected:")
-            print(f"  Exposure times: {len(exposure_times)} values")
-            print(f"  Apertures: {len(apertures)} values")
-            print(f"  ISO values: {len(iso_values)} values")
-            
+        Returns:
+            True if a fresh cache entry was found and loaded
+        """
+        entry = _read_caps_cache().get(key)
+        if not entry:
+            return False
+        try:
+            if time.time() - entry['saved'] > _CAPS_CACHE_MAX_AGE:
+                return False
+            # Only the raw choice strings are stored; parsing them is cheap
+            self._shutter_choices = list(entry['shutter'])
+            self._shutter_values, self._shutter_names = _parse_choices(self._shutter_choices, _parse_shutter)
+            self._aperture_choices = list(entry['aperture'])
+            self._aperture_values, self._aperture_names = _parse_choices(self._aperture_choices, _parse_aperture)
+            self.capabilities = CameraCapabilities(**entry['capabilities'])
+            self._choices_unverified = True
+        except (KeyError, TypeError, ValueError) as e:
+            logger.debug("Ignoring bad capabilities cache entry for %s: %s", key, e)
+            self._reset_choice_cache()
+            return False
+        return True
+    
+    def _save_cached_capabilities(self, key: str) -> None:
+        """Store the current capabilities and parsed choices in the on-disk cache."""
+        caps = self.capabilities
+        _write_caps_cache(key, {
+            'saved': time.time(),
+            'shutter': self._shutter_choices,
+            'aperture': self._aperture_choices,
+            'capabilities': {
+                'exposure_times': caps.exposure_times,
+                'apertures': caps.apertures,
+                'iso_values': caps.iso_values,
+                'has_live_view': caps.has_live_view,
+                'supports_bulb_mode': caps.supports_bulb_mode,
+            },
+        })
+    
+    def _start_keepalive(self) -> None:
+        """Disable in-camera auto power off and start the keepalive thread.
+        
+        Does nothing if the keepalive thread is already running, e.g. when
+        connect() is called again on a connected camera.
+        """
+        if self._keepalive is not None and self._keepalive.is_alive():
+            return
+        
+        try:
+            if self._config_root is None:
+                self._load_widgets()
+            autopoweroff = self._config_root.get_child_by_name('autopoweroff')
+            autopoweroff.set_value('0')
+            self.camera.set_config(self._config_root)
         except Exception as e:
-            print(f"Warning: Could not query camera capabilities: {e}")
-            # Use default capabilities
-            self.capabilities = CameraCapabilities(
-                exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0],
-                apertures=[1.4, 2.0, 2.8, 4.0, 5.6, 8.0, 11.0, 16.0],
-                iso_values=["auto", "100", "200", "400", "800", "1600", "3200", "6400"]
-            )
+            logger.debug("Could not disable auto power off: %s", e)
+        
+        self._stop_keepalive.clear()
+        self._keepalive = threading.Thread(target=self._keepalive_loop,
+                                           name="skycam-keepalive", daemon=True)
+        self._keepalive.start()
+    
+    def _keepalive_loop(self) -> None:
+        """Ping the camera every keepalive_interval seconds until stopped."""
+        while not self._stop_keepalive.wait(self.keepalive_interval):
+            with self._camera_lock:
+                if not self.connected:
+                    return
+                try:
+                    self.camera.get_summary()
+                except Exception as e:
+                    logger.warning("Camera keepalive failed: %s", e)
+    
+    def _stop_keepalive_thread(self) -> None:
+        """Stop the keepalive thread if it is running."""
+        if self._keepalive is not None:
+            self._stop_keepalive.set()
+            self._keepalive.join()
+            self._keepalive = None
     
     def disconnect(self) -> None:
         """Disconnect from camera and cleanup."""
-        if self.camera and self.connected:
-            try:
-                self.camera.exit()
-                self.connected = False
-                print("Camera disconnected")
-            except Exception as e:
-                print(f"Warning: Error during camera disconnect: {e}")
-            finally:
-                self.camera = None
+        self._stop_keepalive_thread()
+        
+        if self._executor is not None:
+            # Let an in-flight capture finish before closing the handle
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        
+        # The keepalive thread and capture worker take the camera lock, so
+        # they are stopped above before it is acquired here.
+        with self._camera_lock:
+            if self.camera and self.connected:
+                try:
+                    self.camera.exit()
+                    self.connected = False
+                    logger.info("Camera disconnected")
+                except Exception as e:
+                    logger.warning("Error during camera disconnect: %s", e)
+                finally:
+                    self.camera = None
+                    self._reset_choice_cache()
     
     def validate_settings(self, settings: CameraSettings) -> Tuple[CameraSettings, List[str]]:
         """Validate and adjust camera settings.
         
+        Prefer apply_settings() when the adjusted settings are also going to
+        be written to the camera.
+        
         Args:
             settings: Settings to validate
             
         Returns:
-            Tuple of (validated_settings, warnings)
+            Tuple of (validated_settings, warnings). The input instance is
+            returned unchanged when no adjustment was needed.
         """
         warnings = []
         
         if not self.capabilities:
             return settings, warnings
         
-        validated = CameraSettings(
-            exposure=settings.exposure,
-            aperture=settings.aperture,
-            iso=settings.iso,
-            delay=settings.delay,
-            quality=settings.quality,
-            max_exposures=settings.max_exposures
-        )
+        changes = {}
         
         # Validate exposure time
-        if validated.exposure not in self.capabilities.exposure_times:
-            closest = min(self.capabilities.exposure_times, 
-                         key=lambda x: abs(x - validated.exposure))
-            if closest != validated.exposure:
-                warnings.append(f"Exposure adjusted from {validated.exposure}s to {closest}s")
-                validated.exposure = closest
+        if settings.exposure not in self.capabilities._exposure_set:
+            closest = closest_sorted(self.capabilities.exposure_times, settings.exposure)
+            if closest != settings.exposure:
+                warnings.append(f"Exposure adjusted from {settings.exposure}s to {closest}s")
+                changes['exposure'] = closest
         
         # Validate aperture
-        if validated.aperture not in self.capabilities.apertures:
-            closest = min(self.capabilities.apertures,
-                         key=lambda x: abs(x - validated.aperture))
-            if closest != validated.aperture:
-                warnings.append(f"Aperture adjusted from f/{validated.aperture} to f/{closest}")
-                validated.aperture = closest
+        if settings.aperture not in self.capabilities._aperture_set:
+            closest = closest_sorted(self.capabilities.apertures, settings.aperture)
+            if closest != settings.aperture:
+                warnings.append(f"Aperture adjusted from f/{settings.aperture} to f/{closest}")
+                changes['aperture'] = closest
         
         # Validate ISO
-        if validated.iso not in self.capabilities.iso_values:
-            warnings.append(f"ISO value '{validated.iso}' may not be supported")
+        if settings.iso not in self.capabilities._iso_set:
+            warnings.append(f"ISO value '{settings.iso}' may not be supported")
+        
+        # Only copy when something was adjusted
+        validated = replace(settings, **changes) if changes else settings
         
         return validated, warnings
     
     def configure_camera(self, settings: CameraSettings) -> List[str]:
         """Configure camera with validated settings.
         
+        Prefer apply_settings(), which validates and configures in one pass.
+        
         Args:
             settings: Camera settings to apply
             
         Returns:
             List of warnings
         """
-        if not self.connected:
-            raise CameraError("Camera not connected")
+        with self._camera_lock:
+            if not self.connected:
+                raise CameraError("Camera not connected")
+            
+            self._ensure_widgets()
+            shutter_pos = None
+            if self._shutter_values:
+                shutter_pos = _closest_position(self._shutter_values, settings.exposure)
+            aperture_pos = None
+            if self._aperture_values:
+                aperture_pos = _closest_position(self._aperture_values, settings.aperture)
+            
+            return self._write_config(settings, shutter_pos, aperture_pos)
+    
+    def apply_settings(self, settings: CameraSettings) -> Tuple[CameraSettings, List[str]]:
+        """Validate settings against the camera and configure it in one pass.
+        
+        Equivalent to validate_settings() followed by configure_camera(), but
+        each closest-choice lookup is done once and gives both the adjusted
+        value and the widget choice to set.
+        
+        Args:
+            settings: Settings to apply
+            
+        Returns:
+            Tuple of (applied_settings, warnings)
+            
+        Raises:
+            CameraError: If the camera is not connected
+        """
+        with self._camera_lock:
+            if not self.connected:
+                raise CameraError("Camera not connected")
+            
+            self._ensure_widgets()
+            warnings = []
+            
+            # Exposure time
+            shutter_pos = None
+            exposure = settings.exposure
+            if self._shutter_values:
+                shutter_pos = _closest_position(self._shutter_values, exposure)
+                exposure = self._shutter_values[shutter_pos]
+            elif self.capabilities:
+                exposure = closest_sorted(self.capabilities.exposure_times, exposure)
+            if exposure != settings.exposure:
+                warnings.append(f"Exposure adjusted from {settings.exposure}s to {exposure}s")
+            
+            # Aperture
+            aperture_pos = None
+            aperture = settings.aperture
+            if self._aperture_values:
+                aperture_pos = _closest_position(self._aperture_values, aperture)
+                aperture = self._aperture_values[aperture_pos]
+            elif self.capabilities:
+                aperture = closest_sorted(self.capabilities.apertures, aperture)
+            if aperture != settings.aperture:
+                warnings.append(f"Aperture adjusted from f/{settings.aperture} to f/{aperture}")
+            
+            # ISO
+            if self.capabilities and settings.iso not in self.capabilities._iso_set:
+                warnings.append(f"ISO value '{settings.iso}' may not be supported")
+            
+            applied = settings
+            if exposure != settings.exposure or aperture != settings.aperture:
+                applied = replace(settings, exposure=exposure, aperture=aperture)
+            warnings.extend(self._write_config(applied, shutter_pos, aperture_pos))
+            
+            return applied, warnings
+    
+    def _write_config(self, settings: CameraSettings, shutter_pos: Optional[int],
+                      aperture_pos: Optional[int]) -> List[str]:
+        """Set the cached widgets for settings and write them to the camera.
         
+        Args:
+            settings: Settings to apply
+            shutter_pos: Position of the chosen value in the parsed shutterspeed choices
+            aperture_pos: Position of the chosen value in the parsed f-number choices
+            
+        Returns:
+            List of warnings
+        """
         warnings = []
+        last = self._last_applied
+        applied = dict(last)
+        changed = False
+        
+        def written(setting: str, ok: bool) -> bool:
+            # Record the outcome of one setting; failed ones are retried next time
+            if ok:
+                applied[setting] = getattr(settings, setting)
+            else:
+                applied.pop(setting, None)
+            return ok
         
         try:
-            # Configure exposure time
-            try:
-                exposure_config = self.camera.get_config('shutterspeed')
-                # Find closest exposure time
-                closest_idx = 0
-                closest_diff = float('inf')
-                for i in range(exposure_config.get_count()):
-                    choice = exposure_config.get_choice(i)
-                    if choice and 's' in choice:
-                        value = float(choice.replace('s', ''))
-                        diff = abs(value - settings.exposure)
-                        if diff < closest_diff:
-                            closest_diff = diff
-                            closest_idx = i
-                
-                exposure_config.set_value(closest_idx)
-                self.camera.set_config(exposure_config)
-            except Exception as e:
-                warnings.append(f"Could not set exposure: {e}")
+            # Capabilities restored from the cache come without widgets
+            if self._config_root is None:
+                self._load_widgets()
             
-            # Configure aperture
-            try:
-                aperture_config = self.camera.get_config('f-number')
-                # Find closest aperture
-                closest_idx = 0
-                closest_diff = float('inf')
-                for i in range(aperture_config.get_count()):
-                    choice = aperture_config.get_choice(i)
-                    if choice and 'f/' in choice:
-                        value = float(choice.replace('f/', ''))
-                        diff = abs(value - settings.aperture)
-                        if diff < closest_diff:
-                            closest_diff = diff
-                            closest_idx = i
-                
-                aperture_config.set_value(closest_idx)
-                self.camera.set_config(aperture_config)
-            except Exception as e:
-                warnings.append(f"Could not set aperture: {e}")
+            # Only touch settings that changed since the last configure
+            if last.get('exposure') != settings.exposure:
+                changed |= written('exposure', self._set_choice(
+                    self._shutter_widget, self._shutter_names, shutter_pos, "exposure", warnings))
+            
+            if last.get('aperture') != settings.aperture:
+                changed |= written('aperture', self._set_choice(
+                    self._aperture_widget, self._aperture_names, aperture_pos, "aperture", warnings))
             
             # Configure ISO
             try:
-                if settings.iso != "auto":
-                    iso_config = self.camera.get_config('iso')
-                    iso_config.set_value(settings.iso)
-                    self.camera.set_config(iso_config)
-            except Exception as e:
+                if settings.iso != "auto" and last.get('iso') != settings.iso:
+                    if self._iso_widget is None:
+                        raise CameraError("no choices available")
+                    self._iso_widget.set_value(settings.iso)
+                    changed = written('iso', True)
+            except (CameraError, gp.GPhoto2Error, TypeError, ValueError) as e:
+                written('iso', False)
                 warnings.append(f"Could not set ISO: {e}")
             
-            # Configure image quality to RAW
+            # Configure image quality (RAW by default)
             try:
-                quality_config = self.camera.get_config('imagequality')
-                # Set to RAW format (highest quality)
-                quality_config.set_value(7)  # This may vary by camera
-                self.camera.set_config(quality_config)
-            except Exception as e:
+                if last.get('quality') != settings.quality:
+                    if self._quality_widget is None:
+                        raise CameraError("imagequality not available")
+                    self._quality_widget.set_value(_quality_choice(self._quality_widget, settings.quality))
+                    changed = written('quality', True)
+            except (CameraError, gp.GPhoto2Error, TypeError, ValueError) as e:
+                written('quality', False)
                 warnings.append(f"Could not set image quality: {e}")
             
+            # Write all changed widgets in a single round trip
+            if changed:
+                try:
+                    self.camera.set_config(self._config_root)
+                except gp.GPhoto2Error as e:
+                    warnings.append(f"Could not write camera config: {e}")
+                    applied = {}
+            
         except Exception as e:
             warnings.append(f"Error configuring camera: {e}")
+            applied = {}
+        
+        # A setting that can't be set (e.g. a missing widget) only repeats its
+        # warning; the others are skipped while unchanged
+        self._last_applied = applied
         
         return warnings
     
-    def capture_single(self, filename: Optional[str] = None) -> CaptureResult:
+    def _set_choice(self, widget, names: List[str], pos: Optional[int],
+                    name: str, warnings: List[str]) -> bool:
+        """Set a widget to one of its parsed choices.
+        
+        Radio widgets only accept the choice string, not its index. The
+        change is only made on the widget; _write_config() writes the
+        config tree back to the camera.
+        
+        Args:
+            widget: Cached config widget
+            names: Widget choice string for each parsed choice
+            pos: Position of the chosen value (None if there are no choices)
+            name: Setting name used in warnings
+            warnings: List that failures are appended to
+            
+        Returns:
+            True if the widget was changed
+        """
+        try:
+            if pos is None:
+                raise CameraError("no choices available")
+            widget.set_value(names[pos])
+            return True
+        except (CameraError, gp.GPhoto2Error, IndexError, TypeError, ValueError) as e:
+            warnings.append(f"Could not set {name}: {e}")
+            return False
+    
+    def capture_single(self, filename: Optional[str] = None, download: bool = False) -> CaptureResult:
         """Capture a single image.
         
         Args:
             filename: Custom filename (without extension)
+            download: Transfer the image to the host; the contents are
+                returned in result.data. The image stays on the camera's
+                storage until delete_from_card() is called with its filepath
             
         Returns:
             CaptureResult with success status and file info
@@ -345,24 +900,62 @@ class Camera:
         if not self.connected:
             return CaptureResult(success=False, error_message="Camera not connected")
         
-        try:
-            # Start live view (required for DSLR)
-            try:
-                self.camera.trigger_capture()
-            except Exception as e:
-                pass  # Live view might not be needed for all cameras
-            
-            # Capture image
-            camera_file = self.camera.capture(gp.GP_CAPTURE_IMAGE)
+        # Runs on the calling thread: waiting on the worker would deadlock
+        # a caller that already holds the camera lock
+        return self._capture(filename, download)
+    
+    def capture_async(self, filename: Optional[str] = None,
+                      download: bool = False) -> "Future[CaptureResult]":
+        """Capture a single image on a background worker.
+        
+        The capture and file transfer run on a single worker thread owned by
+        the camera, so the caller can carry on while the camera is busy.
+        
+        Args:
+            filename: Custom filename (without extension)
+            download: Transfer the image to the host; the contents are
+                returned in result.data. The image stays on the camera's
+                storage until delete_from_card() is called with its filepath
             
-            # Get file path and name
-            filepath = camera_file.get_filepath()
-            filename = camera_file.get_name()
+        Returns:
+            Future resolving to a CaptureResult
+        """
+        if not self.connected:
+            future: "Future[CaptureResult]" = Future()
+            future.set_result(CaptureResult(success=False, error_message="Camera not connected"))
+            return future
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="skycam-capture")
+        return self._executor.submit(self._capture, filename, download)
+    
+    def _capture(self, filename: Optional[str] = None, download: bool = False) -> CaptureResult:
+        """Run a capture on the calling thread."""
+        try:
+            with self._camera_lock:
+                if self._needs_trigger:
+                    self.camera.trigger_capture()
+                
+                # Capture image
+                camera_file = self.camera.capture(gp.GP_CAPTURE_IMAGE)
+                
+                # Get file path and name
+                filepath = camera_file.get_filepath()
+                filename = camera_file.get_name()
+                
+                data = None
+                if download:
+                    # Fetch in the same locked section; the card copy is only
+                    # deleted once the caller has stored the data safely
+                    host_file = self.camera.file_get(os.path.dirname(filepath), filename,
+                                                     gp.GP_FILE_TYPE_NORMAL)
+                    data = memoryview(host_file.get_data_and_size())
             
             return CaptureResult(
                 success=True,
                 filename=filename,
-                filepath=filepath
+                filepath=filepath,
+                data=data
             )
             
         except Exception as e:
@@ -371,6 +964,46 @@ class Camera:
                 error_message=f"Capture failed: {e}"
             )
     
+    def delete_from_card(self, filepath: str) -> bool:
+        """Delete a captured image from the camera's storage.
+        
+        Call this only after a downloaded image has been saved on the host.
+        
+        Args:
+            filepath: Path of the image on the camera, as in CaptureResult.filepath
+            
+        Returns:
+            True if the image was deleted
+        """
+        if not self.connected:
+            return False
+        
+        try:
+            with self._camera_lock:
+                self.camera.file_delete(os.path.dirname(filepath), os.path.basename(filepath))
+            return True
+        except Exception as e:
+            logger.warning("Could not delete %s from the camera: %s", filepath, e)
+            return False
+    
+    def capture_preview(self) -> Optional[memoryview]:
+        """Capture a live view preview frame without touching camera storage.
+        
+        Returns:
+            JPEG data of the preview, or None if not connected or the camera
+            can't capture previews
+        """
+        if not self.connected:
+            return None
+        
+        try:
+            with self._camera_lock:
+                preview = self.camera.capture_preview()
+                return memoryview(preview.get_data_and_size())
+        except Exception as e:
+            logger.warning("Could not capture preview: %s", e)
+            return None
+    
     def start_live_view(self) -> bool:
         """Start live view (required for DSLR operation).
         
@@ -385,7 +1018,7 @@ class Camera:
             # For now, just return True to indicate live view capability
             return True
         except Exception as e:
-            print(f"Warning: Could not start live view: {e}")
+            logger.warning("Could not start live view: %s", e)
             return False
     
     def get_camera_info(self) -> Dict[str, Any]:
@@ -415,4 +1048,44 @@ class Camera:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.disconnect()
+        if not self.keep_alive:
+            self.disconnect()
+
+
+# Process-wide camera handle, so repeated captures skip the libgphoto2
+# init and port probing that a fresh connect() costs.
+_SHARED: Optional[Camera] = None
+_SHARED_LOCK = threading.Lock()
+
+
+def get_shared_camera(port: Optional[str] = None,
+                      keepalive_interval: Optional[float] = None) -> Camera:
+    """Get the shared camera, connecting it on first use.
+    
+    Args:
+        port: Camera port (None to reuse the current port or auto-detect)
+        keepalive_interval: Keepalive ping interval used when the shared
+            camera is created (None to disable)
+        
+    Returns:
+        Connected Camera instance shared for the lifetime of the process
+    """
+    global _SHARED
+    with _SHARED_LOCK:
+        if _SHARED is not None and port is not None and _SHARED.port != port:
+            _SHARED.disconnect()
+            _SHARED = None
+        if _SHARED is None:
+            _SHARED = Camera(port=port, keepalive_interval=keepalive_interval)
+            _SHARED.keep_alive = True
+        _SHARED.ensure_connected()
+        return _SHARED
+
+
+def _shutdown_shared() -> None:
+    """Disconnect the shared camera at interpreter exit."""
+    if _SHARED is not None:
+        _SHARED.disconnect()
+
+
+atexit.register(_shutdown_shared)
@@ -3,15 +3,86 @@
 This module provides template loading, validation, and management functionality.
 """
 
+import datetime
+import json
+import logging
 import os
+import re
+import uuid
+from collections import OrderedDict
 import yaml
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+from dataclasses import dataclass, fields, replace
 from pathlib import Path
-from .camera import CameraSettings, CameraCapabilities
+from types import MappingProxyType
+from .camera import CameraSettings, CameraCapabilities, closest_sorted
 
+logger = logging.getLogger(__name__)
 
-@dataclass
+# Default locations, resolved once at import
+_DEFAULT_CONFIG_DIR = Path.home() / ".config" / "skycam"
+_DEFAULT_TEMPLATES_DIR = _DEFAULT_CONFIG_DIR / "templates"
+_DEFAULT_TEMPLATE_PATH = _DEFAULT_TEMPLATES_DIR / "default.yml"
+
+# Configuration defaults, except templates_directory which follows the
+# config directory in use
+_DEFAULT_CONFIG = MappingProxyType({
+    'default_template': 'default',
+    'output_directory': str(Path.home() / 'Pictures' / 'Skycam'),
+    'filename_pattern': 'SkyImage-{timestamp}',
+    'timestamp_format': 'YYYY-MM-DD_HH:MM:SS',
+    'auto_detect_camera': True,
+    'default_port': '',
+    'auto_adjust_settings': True,
+    'warn_on_adjustment': True,
+    'max_retries': 3
+})
+
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    import tomli as tomllib
+
+# Template file extensions, in lookup order. TOML parses much faster than
+# YAML, so a migrated template wins over a leftover YAML one.
+_TEMPLATE_SUFFIXES = ('.toml', '.yml')
+
+
+def _toml_value(value: Any) -> str:
+    """Format a scalar template value as a TOML value."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        # A JSON string is also a valid TOML basic string
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, (datetime.date, datetime.time)):
+        # YAML reads unquoted dates as dates; ISO format is TOML's literal form
+        return value.isoformat()
+    raise TypeError(f"Cannot write {type(value).__name__} value to TOML")
+
+
+def _dump_toml(data: Dict[str, Any]) -> bytes:
+    """Serialize a flat template dict to TOML, omitting unset (None) values."""
+    return ''.join(f"{key} = {_toml_value(value)}\n"
+                   for key, value in data.items() if value is not None).encode('utf-8')
+
+# Placeholders every filename_pattern must contain, and a finder for the
+# {name} placeholders a pattern has
+_REQUIRED_PATTERN_TOKENS = frozenset({'timestamp'})
+_find_pattern_tokens = re.compile(r"\{(\w+)\}").findall
+
+# CameraSettings fields with their defaults, for fields a template leaves unset
+_SETTINGS_DEFAULTS = tuple((f.name, f.default) for f in fields(CameraSettings))
+
+
+@dataclass(slots=True)
 class Template:
     """Template definition for camera settings."""
     name: str
@@ -33,15 +104,13 @@ class Template:
     temperature_monitoring: Optional[bool] = None
     
     def to_settings(self) -> CameraSettings:
-        """Convert template to CameraSettings."""
-        return CameraSettings(
-            exposure=self.exposure or 8.0,
-            aperture=self.aperture or 1.4,
-            iso=self.iso or "auto",
-            delay=self.delay or 12.0,
-            quality=self.quality or "raw",
-            max_exposures=self.max_exposures or 0
-        )
+        """Convert template to CameraSettings.
+        
+        Fields the template leaves unset (None) take the CameraSettings
+        default; set values, including zero, are kept.
+        """
+        return CameraSettings(**{name: default if (value := getattr(self, name)) is None else value
+                                 for name, default in _SETTINGS_DEFAULTS})
     
     def validate(self, capabilities: Optional[CameraCapabilities] = None) -> List[str]:
         """Validate template against camera capabilities.
@@ -51,43 +120,148 @@ class Template:
         """
         warnings = []
         
-        if capabilities:
-            # Validate exposure
-            if self.exposure is not None:
-                if self.exposure not in capabilities.exposure_times:
-                    closest = min(capabilities.exposure_times,
-                                 key=lambda x: abs(x - self.exposure))
-                    warnings.append(f"Exposure {self.exposure}s not available, closest is {closest}s")
+        if capabilities is not None:
+            # Membership uses the capabilities' frozensets and closest
+            # values bisect their sorted lists; messages are only
+            # formatted for values that don't match
+            exposure = self.exposure
+            if exposure is not None and exposure not in capabilities._exposure_set:
+                closest = closest_sorted(capabilities.exposure_times, exposure)
+                warnings.append(f"Exposure {exposure}s not available, closest is {closest}s")
             
-            # Validate aperture
-            if self.aperture is not None:
-                if self.aperture not in capabilities.apertures:
-                    closest = min(capabilities.apertures,
-                                 key=lambda x: abs(x - self.aperture))
-                    warnings.append(f"Aperture f/{self.aperture} not available, closest is f/{closest}")
+            aperture = self.aperture
+            if aperture is not None and aperture not in capabilities._aperture_set:
+                closest = closest_sorted(capabilities.apertures, aperture)
+                warnings.append(f"Aperture f/{aperture} not available, closest is f/{closest}")
             
-            # Validate ISO
-            if self.iso is not None and self.iso != "auto":
-                if self.iso not in capabilities.iso_values:
-                    warnings.append(f"ISO {self.iso} may not be supported")
+            iso = self.iso
+            if iso is not None and iso != "auto" and iso not in capabilities._iso_set:
+                warnings.append(f"ISO {iso} may not be supported")
         
-        # Validate filename pattern
+        # Validate filename pattern with one scan for all of its placeholders
         if self.filename_pattern:
-            if "{timestamp}" not in self.filename_pattern:
-                warnings.append("filename_pattern should include {timestamp} for proper file naming")
+            missing = _REQUIRED_PATTERN_TOKENS.difference(_find_pattern_tokens(self.filename_pattern))
+            if missing:
+                placeholders = ", ".join(f"{{{token}}}" for token in sorted(missing))
+                warnings.append(f"filename_pattern should include {placeholders} for proper file naming")
         
         return warnings
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert template to dictionary."""
-        return asdict(self)
+        # Built by hand; asdict() deep-copies every value, and all of
+        # these are immutable scalars
+        return {
+            'name': self.name,
+            'description': self.description,
+            'aperture': self.aperture,
+            'exposure': self.exposure,
+            'iso': self.iso,
+            'delay': self.delay,
+            'quality': self.quality,
+            'max_exposures': self.max_exposures,
+            'filename_pattern': self.filename_pattern,
+            'timestamp_format': self.timestamp_format,
+            'temperature_monitoring': self.temperature_monitoring,
+        }
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Template':
-        """Create template from dictionary."""
+        """Create template from dictionary.
+        
+        Raises:
+            TypeError: If name is missing or data has unknown keys
+        """
         return cls(**data)
 
 
+# Parsed templates keyed by (path, mtime_ns, size), so an unchanged file is
+# only parsed once per process. Kept in least-recently-used order and capped,
+# so entries for edited or deleted files don't pile up.
+_TEMPLATE_CACHE_SIZE = 128
+_TEMPLATE_CACHE: "OrderedDict[Tuple[str, int, int], Template]" = OrderedDict()
+
+
+def _cache_template(key: Tuple[str, int, int], template: Template) -> None:
+    """Add a parsed template to the cache, evicting the least recently used entry."""
+    _TEMPLATE_CACHE[key] = template
+    if len(_TEMPLATE_CACHE) > _TEMPLATE_CACHE_SIZE:
+        _TEMPLATE_CACHE.popitem(last=False)
+
+
+# Template listings by absolute directory path, as (mtime_ns, [(name, path),
+# ...]) with absolute paths, so a later chdir can't mix directories up. Adding,
+# removing or renaming a file changes the directory's mtime; saves made
+# through TemplateManager also drop the entry, in case they land within the
+# same filesystem timestamp tick as the listing.
+_LISTING_CACHE: Dict[str, Tuple[int, List[Tuple[str, str]]]] = {}
+
+
+# Parsed config files by absolute path, as (mtime_ns, size, config). One
+# entry per file, replaced whenever the file changes.
+_CONFIG_CACHE: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+
+
+def _read_sidecar(path: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+    """Read template data from a JSON sidecar if it matches the YAML file.
+    
+    Args:
+        path: Path of the sidecar file
+        stat: Stat result of the YAML file it was written for
+        
+    Returns:
+        Template data, or None if the sidecar is missing or stale
+    """
+    try:
+        with open(path, 'rb') as f:
+            entry = json.load(f)
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry['template']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+
+def _write_atomic(path: str, content: bytes) -> None:
+    """Write a file in one call, beside its target, and rename it into place.
+    
+    Renaming means a crash never leaves a half-written file behind. A
+    symlinked path is resolved first, so the link's target is replaced and
+    the link kept. The file keeps the mode of the one it replaces; new
+    files are created 0666 less the umask, like open() would.
+    """
+    path = os.path.realpath(path)
+    directory, filename = os.path.split(path)
+    tmp_path = os.path.join(directory, f".{filename}.{uuid.uuid4().hex[:8]}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o666)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass  # New file, keep the umask-based mode
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_sidecar(path: str, stat: os.stat_result, data: Dict[str, Any]) -> None:
+    """Write parsed template data to a JSON sidecar, skipping unwritable directories."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump({'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'template': data}, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        # Read-only directory, or values JSON can't represent
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
 class TemplateManager:
     """Manages template loading, validation, and storage."""
     
@@ -98,26 +272,40 @@ class TemplateManager:
             templates_dir: Directory containing template files
             config_dir: Configuration directory
         """
-        if config_dir is None:
-            config_dir = Path.home() / ".config" / "skycam"
+        self.config_dir = _DEFAULT_CONFIG_DIR if config_dir is None else Path(config_dir)
         
         if templates_dir is None:
-            templates_dir = config_dir / "templates"
+            self.templates_dir = (_DEFAULT_TEMPLATES_DIR if config_dir is None
+                                  else self.config_dir / "templates")
+        else:
+            self.templates_dir = Path(templates_dir)
         
-        self.config_dir = Path(config_dir)
-        self.templates_dir = Path(templates_dir)
+        # The directory is created on the first save, so managers that only
+        # read templates never create it. Reads aren't free of writes
+        # though: load_template() leaves JSON sidecars beside YAML templates
+        # in an existing templates directory.
+        self._dir_ready = False
         
-        # Ensure directories exist
-        self.templates_dir.mkdir(parents=True, exist_ok=True)
+        # Template paths are built by string concatenation on this prefix,
+        # which is much cheaper than Path's / operator
+        self._tdir = os.fspath(self.templates_dir) + os.sep
+        self._tdir_abs = os.path.abspath(self.templates_dir)
         
         # Default template path
-        self.default_template_path = self.templates_dir / "default.yml"
+        if self.templates_dir is _DEFAULT_TEMPLATES_DIR:
+            self.default_template_path = _DEFAULT_TEMPLATE_PATH
+        else:
+            self.default_template_path = self.templates_dir / "default.yml"
     
     def load_template(self, name: str) -> Template:
         """Load a template by name.
         
+        A YAML template in the templates directory gets a JSON sidecar
+        (<name>.yml.cache.json) the first time it is parsed, which later
+        loads read instead.
+        
         Args:
-            name: Template name (without .yml extension) or path to file
+            name: Template name (without .toml/.yml extension) or path to file
             
         Returns:
             Template instance
@@ -126,41 +314,213 @@ class TemplateManager:
             FileNotFoundError: If template not found
             ValueError: If template is invalid
         """
-        # Check if name is a path
-        if os.path.exists(name):
-            template_path = Path(name)
-        else:
-            template_path = self.templates_dir / f"{name}.yml"
+        template_path, stat = self._resolve_template(name)
+        key = (os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size)
+        cached = _TEMPLATE_CACHE.get(key)
+        if cached is not None:
+            _TEMPLATE_CACHE.move_to_end(key)
+            # Hand out a copy so callers can't modify the cached template
+            return replace(cached)
         
-        if not template_path.exists():
-            raise FileNotFoundError(f"Template '{name}' not found at {template_path}")
+        if template_path.endswith('.toml'):
+            template = self._load_toml(template_path)
+            _cache_template(key, template)
+            return replace(template)
+        
+        # A JSON sidecar written by an earlier run is much faster to read
+        # than the YAML, and records which version of the YAML it came from
+        sidecar_path = self._sidecar_path(template_path)
+        data = None if sidecar_path is None else _read_sidecar(sidecar_path, stat)
+        if data is not None:
+            template = Template.from_dict(data)
+            _cache_template(key, template)
+            return replace(template)
         
         try:
-            with open(template_path, 'r') as f:
-                data = yaml.safe_load(f)
+            with open(template_path, 'rb') as f:
+                data = yaml.load(f, Loader=_YamlLoader)
             
             if not data:
                 raise ValueError(f"Template file {template_path} is empty or invalid")
             
             # Add name if not present
             if 'name' not in data:
-                data['name'] = template_path.stem
+                data['name'] = os.path.splitext(os.path.basename(template_path))[0]
             
-            return Template.from_dict(data)
+            template = Template.from_dict(data)
             
         except yaml.YAMLError as e:
             raise ValueError(f"Invalid YAML in template {template_path}: {e}")
+        
+        if sidecar_path is not None:
+            _write_sidecar(sidecar_path, stat, data)
+        
+        _cache_template(key, template)
+        return replace(template)
+    
+    def load_description(self, name: str) -> Optional[str]:
+        """Load just a template's description, for listings.
+        
+        Reads the parsed-template cache or the JSON sidecar when either is
+        current, so no Template is built. Otherwise the template is loaded
+        in full, which also validates it and writes the sidecar.
+        
+        Args:
+            name: Template name (without .toml/.yml extension) or path to file
+            
+        Returns:
+            The template's description, or None if it has none
+            
+        Raises:
+            FileNotFoundError: If template not found
+            ValueError: If template is invalid
+        """
+        template_path, stat = self._resolve_template(name)
+        cached = _TEMPLATE_CACHE.get((os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size))
+        if cached is not None:
+            return cached.description
+        
+        sidecar_path = self._sidecar_path(template_path)
+        if sidecar_path is not None:
+            data = _read_sidecar(sidecar_path, stat)
+            if data is not None:
+                return data.get('description')
+        
+        return self.load_template(template_path).description
+    
+    def _sidecar_path(self, template_path: str) -> Optional[str]:
+        """JSON sidecar path for a YAML template, or None if it shouldn't have one.
+        
+        Sidecars are only kept in the templates directory, never beside
+        templates loaded by path from directories skycam doesn't own.
+        """
+        if template_path.endswith('.toml'):
+            return None
+        if os.path.dirname(os.path.abspath(template_path)) != self._tdir_abs:
+            return None
+        return f"{template_path}.cache.json"
+    
+    def _resolve_template(self, name: str) -> Tuple[str, os.stat_result]:
+        """Find a template's file from its name or path, returning the path and its stat.
+        
+        Names containing a directory separator or ending in a template
+        extension are paths; anything else is looked up in the templates
+        directory. Either way the stat is the only filesystem check: when
+        the directory has been listed, the listed file is tried first, so
+        YAML templates don't cost a failed stat for the TOML name.
+        """
+        name = os.fspath(name)
+        if os.sep in name or (os.altsep and os.altsep in name) or name.endswith(_TEMPLATE_SUFFIXES):
+            candidates = [name]
+        else:
+            candidates = [f"{self._tdir}{name}{suffix}" for suffix in _TEMPLATE_SUFFIXES]
+            cached = _LISTING_CACHE.get(self._tdir_abs)
+            if cached is not None:
+                listed = next((path for listed_name, path in cached[1] if listed_name == name), None)
+                if listed is not None and not listed.endswith(_TEMPLATE_SUFFIXES[0]):
+                    candidates.reverse()
+        
+        for template_path in candidates:
+            try:
+                return template_path, os.stat(template_path)
+            except FileNotFoundError:
+                pass
+        
+        raise FileNotFoundError(f"Template '{name}' not found at {template_path}")
+    
+    @staticmethod
+    def _load_toml(template_path: str) -> Template:
+        """Parse a TOML template file."""
+        try:
+            with open(template_path, 'rb') as f:
+                data = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ValueError(f"Invalid TOML in template {template_path}: {e}")
+        
+        if not data:
+            raise ValueError(f"Template file {template_path} is empty or invalid")
+        
+        data.setdefault('name', os.path.splitext(os.path.basename(template_path))[0])
+        return Template.from_dict(data)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Forget all parsed templates and listings, forcing the next calls to re-read files."""
+        _TEMPLATE_CACHE.clear()
+        _LISTING_CACHE.clear()
     
     def save_template(self, template: Template) -> None:
         """Save a template to file.
         
+        Templates already migrated to TOML are saved as TOML, all others
+        as YAML. The file is replaced atomically, and left untouched if it
+        already holds the same content.
+        
         Args:
             template: Template to save
         """
-        template_path = self.templates_dir / f"{template.name}.yml"
+        template_path = f"{self._tdir}{template.name}.toml"
+        if os.path.exists(template_path):
+            content = _dump_toml(template.to_dict())
+        else:
+            template_path = f"{self._tdir}{template.name}.yml"
+            content = yaml.dump(template.to_dict(), Dumper=_YamlDumper, encoding='utf-8',
+                                default_flow_style=False, indent=2)
+        
+        if not self._dir_ready:
+            self.templates_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        
+        try:
+            with open(template_path, 'rb') as f:
+                if f.read() == content:
+                    return
+        except FileNotFoundError:
+            pass
+        
+        _write_atomic(template_path, content)
+        _LISTING_CACHE.pop(self._tdir_abs, None)
         
-        with open(template_path, 'w') as f:
-            yaml.dump(template.to_dict(), f, default_flow_style=False, indent=2)
+        # Seed the caches with what was just written, so loading it back
+        # doesn't parse the file again
+        stat = os.stat(template_path)
+        _cache_template((os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size),
+                        replace(template))
+        if template_path.endswith('.yml'):
+            _write_sidecar(f"{template_path}.cache.json", stat, template.to_dict())
+    
+    def migrate_to_toml(self) -> List[str]:
+        """Convert every YAML template in the templates directory to TOML.
+        
+        Every template is converted in memory first, so nothing is written
+        unless all of them convert. Each converted template's YAML file and
+        JSON sidecar are removed once its TOML file is written.
+        
+        Returns:
+            Names of the migrated templates
+            
+        Raises:
+            ValueError: If a YAML template is invalid
+            TypeError: If a template has a value TOML can't represent
+        """
+        converted = []
+        for name, path in self.iter_templates():
+            if not path.endswith('.yml'):
+                continue
+            
+            template = self.load_template(path)
+            converted.append((name, path, _dump_toml(template.to_dict())))
+        
+        for name, path, content in converted:
+            _write_atomic(f"{self._tdir}{name}.toml", content)
+            _LISTING_CACHE.pop(self._tdir_abs, None)
+            for stale_path in (path, f"{path}.cache.json"):
+                try:
+                    os.remove(stale_path)
+                except FileNotFoundError:
+                    pass
+        
+        return [name for name, _, _ in converted]
     
     def list_templates(self) -> List[str]:
         """List all available templates.
@@ -168,13 +528,45 @@ class TemplateManager:
         Returns:
             List of template names
         """
-        templates = []
+        return [name for name, _ in self.iter_templates()]
+    
+    def iter_templates(self) -> Iterator[Tuple[str, str]]:
+        """Iterate over available templates with their file paths.
+        
+        Passing the path to load_template() avoids resolving the name
+        again, so listing and loading every template reads the directory
+        only once. The listing is reused while the directory's mtime is
+        unchanged, so repeated calls cost a single stat.
+        
+        Yields:
+            (name, path) pairs sorted by name
+        """
+        try:
+            mtime_ns = os.stat(self._tdir_abs).st_mtime_ns
+        except FileNotFoundError:
+            return
         
-        if self.templates_dir.exists():
-            for file_path in self.templates_dir.glob("*.yml"):
-                templates.append(file_path.stem)
+        cached = _LISTING_CACHE.get(self._tdir_abs)
+        if cached is not None and cached[0] == mtime_ns:
+            yield from cached[1]
+            return
+        
+        # One directory read; DirEntry carries the name, path and file type
+        templates = {}
+        try:
+            with os.scandir(self._tdir_abs) as entries:
+                for entry in entries:
+                    name, suffix = os.path.splitext(entry.name)
+                    if suffix in _TEMPLATE_SUFFIXES and entry.is_file():
+                        # Where both exist, the TOML file is the one load_template() reads
+                        if suffix == '.toml' or name not in templates:
+                            templates[name] = entry.path
+        except FileNotFoundError:
+            return
         
-        return sorted(templates)
+        listing = sorted(templates.items())
+        _LISTING_CACHE[self._tdir_abs] = (mtime_ns, listing)
+        yield from listing
     
     def create_default_template(self) -> Template:
         """Create and save a default template.
@@ -201,7 +593,8 @@ class TemplateManager:
     
     def ensure_default_template(self) -> None:
         """Ensure default template exists, create if missing."""
-        if not self.default_template_path.exists():
+        if not (self.default_template_path.exists()
+                or self.default_template_path.with_suffix('.toml').exists()):
             self.create_default_template()
     
     def get_template(self, name: str) -> Template:
@@ -217,8 +610,9 @@ class TemplateManager:
             return self.load_template(name)
         except FileNotFoundError:
             if name == "default":
-                self.ensure_default_template()
-                return self.load_template("default")
+                # Neither default.toml nor default.yml exists; the new
+                # template is returned as is rather than read back
+                return replace(self.create_default_template())
             raise
     
     def validate_template(self, template: Template, capabilities: Optional[CameraCapabilities] = None) -> List[str]:
@@ -234,7 +628,7 @@ class TemplateManager:
         warnings = template.validate(capabilities)
         
         # Check required fields
-        if not template.name or template.name.strip() == "":
+        if not template.name or not template.name.strip():
             warnings.append("Template name is required")
         
         return warnings
@@ -249,14 +643,14 @@ class ConfigManager:
         Args:
             config_dir: Configuration directory path
         """
-        if config_dir is None:
-            config_dir = Path.home() / ".config" / "skycam"
-        
-        self.config_dir = Path(config_dir)
+        self.config_dir = _DEFAULT_CONFIG_DIR if config_dir is None else Path(config_dir)
         self.config_file = self.config_dir / "config.yml"
         
-        # Ensure config directory exists
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        # The one default that depends on the config directory, built once
+        self._templates_directory = str(self.config_dir / 'templates')
+        
+        # Created on the first save rather than here, like the templates directory
+        self._dir_ready = False
     
     def load_config(self) -> Dict[str, Any]:
         """Load configuration from file.
@@ -264,47 +658,50 @@ class ConfigManager:
         Returns:
             Configuration dictionary
         """
-        default_config = {
-            'default_template': 'default',
-            'templates_directory': str(self.config_dir / 'templates'),
-            'output_directory': str(Path.home() / 'Pictures' / 'Skycam'),
-            'filename_pattern': 'SkyImage-{timestamp}',
-            'timestamp_format': 'YYYY-MM-DD_HH:MM:SS',
-            'auto_detect_camera': True,
-            'default_port': '',
-            'auto_adjust_settings': True,
-            'warn_on_adjustment': True,
-            'max_retries': 3
-        }
+        default_config = {**_DEFAULT_CONFIG, 'templates_directory': self._templates_directory}
         
-        if not self.config_file.exists():
+        config_path = os.path.abspath(self.config_file)
+        try:
+            stat = os.stat(config_path)
+        except FileNotFoundError:
             self.save_config(default_config)
             return default_config
         
-        try:
-            with open(self.config_file, 'r') as f:
-                config = yaml.safe_load(f) or {}
-            
-            # Merge with defaults for missing keys
-            for key, value in default_config.items():
-                if key not in config:
-                    config[key] = value
-            
-            return config
+        cached = _CONFIG_CACHE.get(config_path)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            config = cached[2]
+        else:
+            try:
+                with open(config_path, 'rb') as f:
+                    config = yaml.load(f, Loader=_YamlLoader) or {}
+            except yaml.YAMLError as e:
+                logger.warning("Invalid config file %s: %s", self.config_file, e)
+                self.save_config(default_config)
+                return default_config
             
-        except yaml.YAMLError as e:
-            print(f"Warning: Invalid config file {self.config_file}: {e}")
-            self.save_config(default_config)
-            return default_config
+            _CONFIG_CACHE[config_path] = (stat.st_mtime_ns, stat.st_size, config)
+        
+        # Merge with defaults for missing keys; the config is flat, so a
+        # shallow union is enough. The union is a new dict, so callers
+        # can't modify the cached one.
+        return default_config | config
     
     def save_config(self, config: Dict[str, Any]) -> None:
         """Save configuration to file.
         
+        The YAML is dumped in memory and written with a single call to a
+        temporary file, which then atomically replaces the config file. Its
+        permissions are kept, and a symlinked config file stays a symlink.
+        
         Args:
             config: Configuration dictionary
         """
-        with open(self.config_file, 'w') as f:
-            yaml.dump(config, f, default_flow_style=False, indent=2)
+        content = yaml.dump(config, Dumper=_YamlDumper, encoding='utf-8',
+                            default_flow_style=False, indent=2)
+        if not self._dir_ready:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            self._dir_ready = True
+        _write_atomic(os.fspath(self.config_file), content)
     
     def get_template_manager(self) -> TemplateManager:
         """Get configured template manager.
@@ -1,5 +1,9 @@
 """Tests for the camera module."""
 
+import dataclasses
+import json
+import threading
+
 import pytest
 import unittest.mock as mock
 from unittest.mock import MagicMock, patch, call
@@ -15,8 +19,45 @@ from skycam_common.camera import (
     CaptureResult,
     CameraError,
     CameraNotFoundError,
-    CameraConnectionError
+    CameraConnectionError,
+    _parse_shutter,
+    _parse_aperture,
+    closest_sorted,
+    get_shared_camera,
+    prefetch_cameras,
 )
+import skycam_common.camera as camera_module
+
+
+@pytest.fixture(autouse=True)
+def reset_autodetect_cache(monkeypatch):
+    """Make every test see a fresh autodetect() result."""
+    monkeypatch.setattr(camera_module, "_AUTODETECT_CACHE", None)
+
+
+@pytest.fixture(autouse=True)
+def caps_cache_path(monkeypatch, tmp_path):
+    """Keep the capabilities cache out of the user's config directory."""
+    path = tmp_path / "camera-caps.json"
+    monkeypatch.setattr(camera_module, "_CAPS_CACHE_PATH", path)
+    return path
+
+
+@pytest.fixture(scope="module")
+def caps():
+    """Capabilities shared by the validation and info tests; frozen, so safe to share."""
+    return CameraCapabilities(
+        exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
+        apertures=[1.4, 2.0, 2.8, 4.0],
+        iso_values=["auto", "100", "200", "400", "800"]
+    )
+
+@pytest.fixture
+def mock_gp(monkeypatch):
+    """Replace the gphoto2 module with a mock for tests that take it."""
+    gp = MagicMock()
+    monkeypatch.setattr(camera_module, "gp", gp)
+    return gp
 
 
 class TestCameraSettings:
@@ -33,6 +74,18 @@ class TestCameraSettings:
         assert settings.quality == "raw"
         assert settings.max_exposures == 0
     
+    def test_settings_frozen(self):
+        """Test settings are immutable, hashable and derived with replace."""
+        settings = CameraSettings()
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.exposure = 15.0
+        
+        updated = dataclasses.replace(settings, exposure=15.0)
+        assert updated.exposure == 15.0
+        assert settings.exposure == 8.0
+        assert hash(settings) == hash(CameraSettings())
+    
     def test_custom_settings(self):
         """Test custom camera settings."""
         settings = CameraSettings(
@@ -70,6 +123,35 @@ class TestCameraCapabilities:
         assert len(capabilities.iso_values) == 6
         assert capabilities.has_live_view is True
         assert capabilities.supports_bulb_mode is False
+    
+    def test_numeric_choices_sorted(self):
+        """Test exposure times and apertures are stored sorted."""
+        capabilities = CameraCapabilities(
+            exposure_times=[30.0, 0.5, 8.0],
+            apertures=[4.0, 1.4, 2.8],
+            iso_values=["800", "auto", "100"]
+        )
+        
+        assert capabilities.exposure_times == (0.5, 8.0, 30.0)
+        assert capabilities.apertures == (1.4, 2.8, 4.0)
+        assert capabilities.iso_values == ("800", "auto", "100")
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            capabilities.apertures = [1.4]
+        # Stored as tuples, so the choices can't change under the lookup sets
+        assert hash(capabilities) == hash(CameraCapabilities([8.0, 0.5, 30.0], [1.4, 2.8, 4.0],
+                                                             ["800", "auto", "100"]))
+    
+    @pytest.mark.parametrize("target, expected", [
+        (0.1, 0.5),    # below range
+        (100.0, 30.0), # above range
+        (8.0, 8.0),    # exact
+        (5.0, 4.0),    # between, closer to lower
+        (25.0, 30.0),  # between, closer to upper
+    ])
+    def test_closest_sorted(self, target, expected):
+        """Test closest-value lookup on sorted choices."""
+        assert closest_sorted([0.5, 1.0, 4.0, 8.0, 30.0], target) == expected
 
 
 class TestCameraErrors:
@@ -91,6 +173,32 @@ class TestCameraErrors:
             raise CameraConnectionError("Connection failed")
 
 
+class TestChoiceParsing:
+    """Test parsing of gphoto2 widget choice strings."""
+    
+    @pytest.mark.parametrize("choice, expected", [
+        ("30s", 30.0),
+        ("0.5s", 0.5),
+        ("1/250s", 0.004),
+        ("1/4000", 0.00025),
+        ("8", 8.0),
+    ])
+    def test_parse_shutter(self, choice, expected):
+        """Test shutterspeed choices including fractional speeds."""
+        assert _parse_shutter(choice) == pytest.approx(expected)
+    
+    @pytest.mark.parametrize("choice", ["bulb", "Bulb", "", "1/0s", "auto"])
+    def test_parse_shutter_unrecognized(self, choice):
+        """Test unrecognized shutterspeed choices are skipped."""
+        assert _parse_shutter(choice) is None
+    
+    def test_parse_aperture(self):
+        """Test f-number choices with and without the f/ prefix."""
+        assert _parse_aperture("f/2.8") == 2.8
+        assert _parse_aperture("5.6") == 5.6
+        assert _parse_aperture("implicit auto") is None
+
+
 class TestCameraInitialization:
     """Test camera initialization."""
     
@@ -100,7 +208,6 @@ class TestCameraInitialization:
         with pytest.raises(ImportError, match="gphoto2 library not available"):
             Camera()
     
-    @patch('skycam_common.camera.gp')
     def test_init_with_port(self, mock_gp):
         """Test camera initialization with specified port."""
         mock_gp.return_value = True
@@ -112,7 +219,6 @@ class TestCameraInitialization:
         assert camera.connected is False
         assert camera.capabilities is None
     
-    @patch('skycam_common.camera.gp')
     def test_init_without_port(self, mock_gp):
         """Test camera initialization with auto-detection."""
         mock_gp.return_value = True
@@ -128,7 +234,6 @@ class TestCameraInitialization:
 class TestCameraDetection:
     """Test camera detection functionality."""
     
-    @patch('skycam_common.camera.gp')
     def test_detect_cameras_no_cameras(self, mock_gp):
         """Test camera detection when no cameras are present."""
         # Mock gphoto2
@@ -143,7 +248,6 @@ class TestCameraDetection:
         
         assert cameras == []
     
-    @patch('skycam_common.camera.gp')
     def test_detect_cameras_with_cameras(self, mock_gp):
         """Test camera detection when cameras are present."""
         # Mock gphoto2 with detected cameras
@@ -159,7 +263,6 @@ class TestCameraDetection:
         assert "usb:/dev/ttyUSB0" in cameras
         assert "usb:/dev/ttyUSB1" in cameras
     
-    @patch('skycam_common.camera.gp')
     def test_detect_cameras_exception(self, mock_gp):
         """Test camera detection with exception handling."""
         mock_gp.camera.Camera.autodetect.side_effect = Exception("Detection failed")
@@ -169,12 +272,56 @@ class TestCameraDetection:
         
         # Should return empty list and print warning
         assert cameras == []
+    
+    def test_detect_cameras_cached(self, mock_gp):
+        """Test autodetect results are reused between detect and connect."""
+        mock_gp.camera.Camera.autodetect.return_value = [
+            ("usb:/dev/ttyUSB0", "Canon EOS 5D")
+        ]
+        mock_gp.Camera.return_value.get_config.side_effect = Exception("Config not available")
+        
+        camera = Camera()
+        assert camera.detect_cameras() == ["usb:/dev/ttyUSB0"]
+        camera.connect()
+        
+        assert camera.port == "usb:/dev/ttyUSB0"
+        mock_gp.camera.Camera.autodetect.assert_called_once()
+    
+    def test_detect_cameras_cache_expires(self, mock_gp, monkeypatch):
+        """Test autodetect is probed again once the TTL has passed."""
+        mock_gp.camera.Camera.autodetect.return_value = []
+        monkeypatch.setattr(camera_module, "_AUTODETECT_TTL", 0.0)
+        
+        camera = Camera()
+        camera.detect_cameras()
+        camera.detect_cameras()
+        
+        assert mock_gp.camera.Camera.autodetect.call_count == 2
+    
+    def test_prefetch_cameras(self, mock_gp):
+        """Test a background scan fills the cache used by detect_cameras."""
+        scanning = threading.Event()
+        release = threading.Event()
+        
+        def slow_autodetect():
+            scanning.set()
+            release.wait(5)
+            return [("usb:001,002", "Canon EOS 5D")]
+        mock_gp.camera.Camera.autodetect.side_effect = slow_autodetect
+        
+        thread = prefetch_cameras()
+        assert scanning.wait(5)
+        
+        # The next detect reuses the background result instead of scanning again
+        release.set()
+        assert Camera().detect_cameras() == ["usb:001,002"]
+        thread.join(5)
+        assert mock_gp.camera.Camera.autodetect.call_count == 1
 
 
 class TestCameraConnection:
     """Test camera connection functionality."""
     
-    @patch('skycam_common.camera.gp')
     def test_connect_auto_detect_success(self, mock_gp):
         """Test successful connection with auto-detection."""
         # Mock camera list with one camera
@@ -198,7 +345,6 @@ class TestCameraConnection:
         assert camera.camera is mock_camera_instance
         mock_camera_instance.init.assert_called_once()
     
-    @patch('skycam_common.camera.gp')
     def test_connect_no_cameras_found(self, mock_gp):
         """Test connection failure when no cameras are found."""
         mock_gp.camera.Camera.autodetect.return_value = []
@@ -210,7 +356,6 @@ class TestCameraConnection:
         cameras = camera.detect_cameras()
         assert cameras == []
     
-    @patch('skycam_common.camera.gp')
     def test_connect_with_specific_port(self, mock_gp):
         """Test connection to specific port."""
         # Mock camera instance
@@ -228,7 +373,6 @@ class TestCameraConnection:
         assert camera.port == "usb:/dev/ttyUSB0"
         mock_camera_instance.init.assert_called_once()
     
-    @patch('skycam_common.camera.gp')
     def test_connect_gphoto2_error(self, mock_gp):
         """Test connection failure due to gphoto2 error."""
         # Create a proper exception class for mocking
@@ -249,7 +393,6 @@ class TestCameraConnection:
         with pytest.raises(Exception):  # Any exception is fine for this test
             camera.connect(auto_detect=False)
     
-    @patch('skycam_common.camera.gp')
     def test_disconnect(self, mock_gp):
         """Test camera disconnection."""
         # Mock camera instance
@@ -269,10 +412,55 @@ class TestCameraConnection:
         mock_camera_instance.exit.assert_called_once()
 
 
+class TestCameraKeepalive:
+    """Test the optional keepalive thread."""
+    
+    def test_keepalive_pings_until_disconnect(self, mock_gp):
+        """Test keepalive pings the camera and stops on disconnect."""
+        mock_camera_instance = MagicMock()
+        pinged = threading.Event()
+        mock_camera_instance.get_summary.side_effect = lambda: pinged.set()
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0", keepalive_interval=0.01)
+        camera.connect(auto_detect=False)
+        
+        assert pinged.wait(timeout=5)
+        autopoweroff = mock_camera_instance.get_config.return_value.get_child_by_name.return_value
+        autopoweroff.set_value.assert_any_call('0')
+        
+        keepalive = camera._keepalive
+        camera.disconnect()
+        
+        assert camera._keepalive is None
+        assert not keepalive.is_alive()
+    
+    def test_keepalive_single_thread_on_reconnect(self, mock_gp):
+        """Test connecting again keeps the running keepalive thread."""
+        camera = Camera(port="usb:/dev/ttyUSB0", keepalive_interval=60)
+        camera.connect(auto_detect=False)
+        keepalive = camera._keepalive
+        
+        camera.connect(auto_detect=False)
+        
+        assert camera._keepalive is keepalive
+        assert [t for t in threading.enumerate() if t.name == "skycam-keepalive"] == [keepalive]
+        camera.disconnect()
+        assert not keepalive.is_alive()
+    
+    def test_keepalive_disabled_by_default(self, mock_gp):
+        """Test no keepalive thread is started unless requested."""
+        mock_gp.Camera.return_value.get_config.side_effect = Exception("Config not available")
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        assert camera._keepalive is None
+
+
 class TestCameraSettingsValidation:
     """Test camera settings validation."""
     
-    @patch('skycam_common.camera.gp')
     def test_validate_settings_no_capabilities(self, mock_gp):
         """Test settings validation without camera capabilities."""
         camera = Camera()
@@ -284,16 +472,10 @@ class TestCameraSettingsValidation:
         assert validated_settings.aperture == 1.4
         assert warnings == []
     
-    @patch('skycam_common.camera.gp')
-    def test_validate_settings_with_capabilities(self, mock_gp):
+    def test_validate_settings_with_capabilities(self, mock_gp, caps):
         """Test settings validation with camera capabilities."""
-        # Mock camera capabilities
         camera = Camera()
-        camera.capabilities = CameraCapabilities(
-            exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
-            apertures=[1.4, 2.0, 2.8, 4.0],
-            iso_values=["auto", "100", "200", "400", "800"]
-        )
+        camera.capabilities = caps
         
         # Test exact match
         settings = CameraSettings(exposure=8.0, aperture=1.4, iso="400")
@@ -303,17 +485,12 @@ class TestCameraSettingsValidation:
         assert validated_settings.aperture == 1.4
         assert validated_settings.iso == "400"
         assert warnings == []
+        assert validated_settings is settings  # nothing adjusted, no copy
     
-    @patch('skycam_common.camera.gp')
-    def test_validate_settings_adjustment(self, mock_gp):
+    def test_validate_settings_adjustment(self, mock_gp, caps):
         """Test settings validation with auto-adjustment."""
-        # Mock camera capabilities
         camera = Camera()
-        camera.capabilities = CameraCapabilities(
-            exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
-            apertures=[1.4, 2.0, 2.8, 4.0],
-            iso_values=["auto", "100", "200", "400", "800"]
-        )
+        camera.capabilities = caps
         
         # Test values that need adjustment
         settings = CameraSettings(exposure=7.0, aperture=2.5, iso="600")
@@ -324,12 +501,282 @@ class TestCameraSettingsValidation:
         assert validated_settings.aperture == 2.8   # Closest to 2.5
         assert validated_settings.iso == "600"
         assert len(warnings) == 3  # One warning for each adjustment
+        assert settings.exposure == 7.0  # input left untouched
+
+
+class TestCameraConfiguration:
+    """Test camera configuration with cached choices."""
+    
+    @staticmethod
+    def _make_widget(choices):
+        widget = MagicMock()
+        widget.get_choices.side_effect = lambda: iter(choices)
+        return widget
+    
+    @staticmethod
+    def _make_camera(widgets):
+        root = MagicMock()
+        root.get_child_by_name.side_effect = lambda name: widgets[name]
+        mock_camera_instance = MagicMock()
+        mock_camera_instance.get_config.return_value = root
+        return mock_camera_instance, root
+    
+    def test_configure_uses_cached_choices(self, mock_gp):
+        """Test configure_camera reuses widgets parsed at connect time."""
+        widgets = {
+            'shutterspeed': self._make_widget(["bulb", "30s", "8s", "4s", "1/2s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8", "f/4"]),
+            'iso': self._make_widget(["auto", "100", "400"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        assert camera.capabilities.exposure_times == (0.5, 4.0, 8.0, 30.0)
+        mock_camera_instance.get_config.assert_called_once_with()
+        
+        # 7s is closest to the "8s" choice; radio widgets are set by choice string
+        warnings = camera.configure_camera(CameraSettings(exposure=7.0, aperture=2.5, iso="400"))
+        
+        assert warnings == []
+        mock_camera_instance.get_config.assert_called_once_with()
+        widgets['shutterspeed'].set_value.assert_called_once_with("8s")
+        widgets['f-number'].set_value.assert_called_once_with("f/2.8")
+        widgets['iso'].set_value.assert_called_once_with("400")
+        widgets['imagequality'].set_value.assert_called_once_with("RAW")
+        # All changes are written back in one call
+        mock_camera_instance.set_config.assert_called_once_with(root)
+    
+    def test_configure_skips_unchanged_settings(self, mock_gp):
+        """Test repeated configure calls only write settings that changed."""
+        widgets = {
+            'shutterspeed': self._make_widget(["30s", "8s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'iso': self._make_widget(["auto", "400"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        settings = CameraSettings(exposure=8.0, aperture=1.4, iso="400")
+        assert camera.configure_camera(settings) == []
+        assert mock_camera_instance.set_config.call_count == 1
+        
+        assert camera.configure_camera(settings) == []
+        assert mock_camera_instance.set_config.call_count == 1
+        
+        camera.configure_camera(CameraSettings(exposure=30.0, aperture=1.4, iso="400"))
+        assert mock_camera_instance.set_config.call_count == 2
+        widgets['shutterspeed'].set_value.assert_called_with("30s")
+        widgets['f-number'].set_value.assert_called_once()
+    
+    def test_configure_skips_unchanged_with_missing_widget(self, mock_gp):
+        """Test a setting the camera can't take doesn't force rewriting the others."""
+        mock_gp.GPhoto2Error = type("GPhoto2Error", (Exception,), {})
+        widgets = {
+            'shutterspeed': self._make_widget(["30s", "8s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        settings = CameraSettings(exposure=8.0, aperture=1.4, iso="400")
+        assert camera.configure_camera(settings) == ["Could not set ISO: no choices available"]
+        assert camera.configure_camera(settings) == ["Could not set ISO: no choices available"]
+        
+        assert mock_camera_instance.set_config.call_count == 1
+        widgets['shutterspeed'].set_value.assert_called_once_with("8s")
+    
+    def test_apply_settings(self, mock_gp):
+        """Test apply_settings snaps and configures in one pass."""
+        widgets = {
+            'shutterspeed': self._make_widget(["30s", "8s", "4s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'iso': self._make_widget(["auto", "400"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        applied, warnings = camera.apply_settings(CameraSettings(exposure=7.0, aperture=2.5, iso="400"))
+        
+        assert applied.exposure == 8.0
+        assert applied.aperture == 2.8
+        assert warnings == [
+            "Exposure adjusted from 7.0s to 8.0s",
+            "Aperture adjusted from f/2.5 to f/2.8",
+        ]
+        widgets['shutterspeed'].set_value.assert_called_once_with("8s")
+        widgets['f-number'].set_value.assert_called_once_with("f/2.8")
+        mock_camera_instance.set_config.assert_called_once_with(root)
+    
+    def test_apply_settings_not_connected(self, mock_gp):
+        """Test apply_settings requires a connection."""
+        camera = Camera()
+        
+        with pytest.raises(CameraError, match="not connected"):
+            camera.apply_settings(CameraSettings())
+    
+    def test_unparseable_choices_fall_back(self, mock_gp):
+        """Test a widget with no numeric choices uses defaults and warns on configure."""
+        mock_gp.GPhoto2Error = type("GPhoto2Error", (Exception,), {})
+        widgets = {
+            'shutterspeed': self._make_widget(["bulb"]),
+            'f-number': self._make_widget(["f/2.8"]),
+            'iso': self._make_widget(["auto"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        assert camera.capabilities.exposure_times == (0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+        warnings = camera.configure_camera(CameraSettings(exposure=8.0, aperture=2.8))
+        assert warnings == ["Could not set exposure: no choices available"]
+    
+    def test_failed_setting_does_not_block_others(self, mock_gp):
+        """Test a widget rejecting its value still lets the other settings be written."""
+        mock_gp.GPhoto2Error = type("GPhoto2Error", (Exception,), {})
+        widgets = {
+            'shutterspeed': self._make_widget(["30s", "8s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'iso': self._make_widget(["auto", "400"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        widgets['shutterspeed'].set_value.side_effect = TypeError("bad value")
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        
+        warnings = camera.configure_camera(CameraSettings(exposure=8.0, aperture=2.8, iso="400"))
+        
+        assert warnings == ["Could not set exposure: bad value"]
+        widgets['f-number'].set_value.assert_called_once_with("f/2.8")
+        widgets['iso'].set_value.assert_called_once_with("400")
+        widgets['imagequality'].set_value.assert_called_once_with("RAW")
+        mock_camera_instance.set_config.assert_called_once_with(root)
+    
+    def test_disconnect_clears_cached_choices(self, mock_gp):
+        """Test disconnect drops cached widgets."""
+        camera = Camera()
+        camera.camera = MagicMock()
+        camera.connected = True
+        camera._shutter_widget = MagicMock()
+        camera._shutter_values = [1.0]
+        camera._shutter_names = ["1s"]
+        
+        camera.disconnect()
+        
+        assert camera._shutter_widget is None
+        assert camera._shutter_values == []
+    
+    def _connect_model(self, mock_gp, model):
+        widgets = {
+            'shutterspeed': self._make_widget(["30s", "8s", "1/2s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'iso': self._make_widget(["auto", "100"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        }
+        mock_camera_instance, root = self._make_camera(widgets)
+        mock_camera_instance.get_abilities.return_value.model = model
+        mock_gp.Camera.return_value = mock_camera_instance
+        mock_gp.gp_library_version.return_value = ["2.5.31"]
+        
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.connect(auto_detect=False)
+        return camera, mock_camera_instance, widgets
+    
+    def test_capabilities_cached_per_model(self, mock_gp, caps_cache_path):
+        """Test a second connect to the same model skips widget enumeration."""
+        first, first_instance, _ = self._connect_model(mock_gp, "Canon EOS 5D")
+        first_instance.get_config.assert_called_once_with()
+        assert "Canon EOS 5D|2.5.31" in json.loads(caps_cache_path.read_text())
+        
+        camera, mock_camera_instance, widgets = self._connect_model(mock_gp, "Canon EOS 5D")
+        
+        mock_camera_instance.get_config.assert_not_called()
+        assert camera.capabilities == first.capabilities
+        
+        # Widgets are fetched on first configure; cached choice strings are used
+        warnings = camera.configure_camera(CameraSettings(exposure=7.0, aperture=2.8, iso="100"))
+        
+        assert warnings == []
+        mock_camera_instance.get_config.assert_called_once_with()
+        widgets['shutterspeed'].set_value.assert_called_once_with("8s")
+        widgets['f-number'].set_value.assert_called_once_with("f/2.8")
+    
+    def test_capabilities_cache_stale_choices(self, mock_gp, caps_cache_path):
+        """Test cached choices that no longer match the camera are re-parsed."""
+        self._connect_model(mock_gp, "Canon EOS 5D")
+        
+        camera, mock_camera_instance, widgets = self._connect_model(mock_gp, "Canon EOS 5D")
+        mock_camera_instance.get_config.assert_not_called()
+        # The camera now lists its shutter speeds in a different order
+        widgets['shutterspeed'].get_choices.side_effect = lambda: iter(["8s", "30s", "1/2s"])
+        
+        applied, warnings = camera.apply_settings(CameraSettings(exposure=8.0, aperture=2.8, iso="100"))
+        
+        assert warnings == []
+        assert applied.exposure == 8.0
+        mock_camera_instance.get_config.assert_called_once_with()
+        widgets['shutterspeed'].set_value.assert_called_once_with("8s")
+        widgets['f-number'].set_value.assert_called_once_with("f/2.8")
+        
+        entry = json.loads(caps_cache_path.read_text())["Canon EOS 5D|2.5.31"]
+        assert entry['shutter'] == ["8s", "30s", "1/2s"]
+    
+    def test_reconnect_drops_previous_session(self, mock_gp, caps_cache_path):
+        """Test connecting again closes the old handle and forgets its widgets."""
+        camera, first_instance, _ = self._connect_model(mock_gp, "Canon EOS 5D")
+        settings = CameraSettings(exposure=8.0, aperture=2.8, iso="100")
+        assert camera.configure_camera(settings) == []
+        
+        second_instance, second_root = self._make_camera({
+            'shutterspeed': self._make_widget(["30s", "8s", "1/2s"]),
+            'f-number': self._make_widget(["f/1.4", "f/2.8"]),
+            'iso': self._make_widget(["auto", "100"]),
+            'imagequality': self._make_widget(["Large Fine JPEG", "RAW"]),
+        })
+        second_instance.get_abilities.return_value.model = "Canon EOS 5D"
+        mock_gp.Camera.return_value = second_instance
+        camera.connect(auto_detect=False)
+        
+        first_instance.exit.assert_called_once_with()
+        # The same settings are written again, through the new config tree
+        assert camera.configure_camera(settings) == []
+        second_instance.set_config.assert_called_once_with(second_root)
+    
+    def test_capabilities_cache_expires(self, mock_gp, monkeypatch):
+        """Test stale cache entries and other models are re-enumerated."""
+        self._connect_model(mock_gp, "Canon EOS 5D")
+        
+        _, other_instance, _ = self._connect_model(mock_gp, "Nikon D850")
+        other_instance.get_config.assert_called_once_with()
+        
+        monkeypatch.setattr(camera_module, "_CAPS_CACHE_MAX_AGE", -1)
+        _, stale_instance, _ = self._connect_model(mock_gp, "Canon EOS 5D")
+        stale_instance.get_config.assert_called_once_with()
 
 
 class TestCameraCapture:
     """Test camera capture functionality."""
     
-    @patch('skycam_common.camera.gp')
     def test_capture_single_success(self, mock_gp):
         """Test successful single capture."""
         # Mock camera instance
@@ -353,8 +800,64 @@ class TestCameraCapture:
         assert result.filepath == "/path/to/image.nef"
         assert result.error_message is None
         mock_camera_instance.capture.assert_called_once_with(mock_gp.GP_CAPTURE_IMAGE)
+        mock_camera_instance.trigger_capture.assert_not_called()
+    
+    def test_capture_single_download(self, mock_gp):
+        """Test downloading a capture returns its data and leaves the card copy until asked."""
+        mock_camera_instance = MagicMock()
+        mock_file = MagicMock()
+        mock_file.get_filepath.return_value = "/store_00010001/DCIM/100CANON/image.nef"
+        mock_file.get_name.return_value = "image.nef"
+        mock_camera_instance.capture.return_value = mock_file
+        mock_camera_instance.file_get.return_value.get_data_and_size.return_value = b"raw-bytes"
+        
+        camera = Camera()
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        result = camera.capture_single(download=True)
+        
+        assert result.success is True
+        assert bytes(result.data) == b"raw-bytes"
+        mock_camera_instance.file_get.assert_called_once_with(
+            "/store_00010001/DCIM/100CANON", "image.nef", mock_gp.GP_FILE_TYPE_NORMAL)
+        mock_camera_instance.file_delete.assert_not_called()
+        
+        assert camera.delete_from_card(result.filepath) is True
+        mock_camera_instance.file_delete.assert_called_once_with(
+            "/store_00010001/DCIM/100CANON", "image.nef")
+        
+        mock_camera_instance.file_delete.side_effect = Exception("card busy")
+        assert camera.delete_from_card(result.filepath) is False
+        camera.disconnect()
+    
+    def test_capture_preview(self, mock_gp):
+        """Test preview capture returns JPEG data."""
+        mock_camera_instance = MagicMock()
+        mock_camera_instance.capture_preview.return_value.get_data_and_size.return_value = b"jpeg"
+        
+        camera = Camera()
+        assert camera.capture_preview() is None
+        
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        assert bytes(camera.capture_preview()) == b"jpeg"
+        mock_camera_instance.capture.assert_not_called()
+    
+    def test_capture_single_with_trigger(self, mock_gp):
+        """Test cameras that need it get trigger_capture before capture."""
+        mock_camera_instance = MagicMock()
+        
+        camera = Camera(trigger_before_capture=True)
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        result = camera.capture_single()
+        
+        assert result.success is True
+        mock_camera_instance.trigger_capture.assert_called_once()
     
-    @patch('skycam_common.camera.gp')
     def test_capture_single_not_connected(self, mock_gp):
         """Test capture failure when not connected."""
         camera = Camera()
@@ -364,7 +867,6 @@ class TestCameraCapture:
         assert result.success is False
         assert result.error_message == "Camera not connected"
     
-    @patch('skycam_common.camera.gp')
     def test_capture_single_exception(self, mock_gp):
         """Test capture failure due to exception."""
         # Mock camera instance
@@ -382,10 +884,89 @@ class TestCameraCapture:
         assert "Capture failed" in result.error_message
 
 
+    def test_capture_async(self, mock_gp):
+        """Test asynchronous capture returns a future with the result."""
+        mock_camera_instance = MagicMock()
+        mock_file = MagicMock()
+        mock_file.get_filepath.return_value = "/path/to/image.nef"
+        mock_file.get_name.return_value = "image.nef"
+        mock_camera_instance.capture.return_value = mock_file
+        
+        camera = Camera()
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        future = camera.capture_async()
+        result = future.result(timeout=5)
+        
+        assert result.success is True
+        assert result.filename == "image.nef"
+        
+        camera.disconnect()
+        assert camera._executor is None
+    
+    def test_capture_waits_for_camera_lock(self, mock_gp):
+        """Test a capture does not touch the camera while another call holds it."""
+        mock_camera_instance = MagicMock()
+        
+        camera = Camera()
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        with camera._camera_lock:
+            # Re-entrant, so locked methods can be called while holding it
+            camera.configure_camera(CameraSettings())
+            future = camera.capture_async()
+            assert not future.done()
+            mock_camera_instance.capture.assert_not_called()
+        
+        assert future.result(timeout=5).success is True
+        mock_camera_instance.capture.assert_called_once()
+        camera.disconnect()
+    
+    def test_capture_single_while_holding_lock(self, mock_gp):
+        """Test capture_single runs inline for a caller holding the camera lock."""
+        mock_camera_instance = MagicMock()
+        
+        camera = Camera()
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        with camera._camera_lock:
+            assert camera.capture_single().success is True
+        
+        mock_camera_instance.capture.assert_called_once()
+        assert camera._executor is None
+    
+    def test_capture_single_trigger_failure(self, mock_gp):
+        """Test a failing trigger_capture fails the capture."""
+        mock_camera_instance = MagicMock()
+        mock_camera_instance.trigger_capture.side_effect = Exception("Trigger failed")
+        
+        camera = Camera(trigger_before_capture=True)
+        camera.camera = mock_camera_instance
+        camera.connected = True
+        
+        result = camera.capture_single()
+        
+        assert result.success is False
+        assert "Trigger failed" in result.error_message
+        mock_camera_instance.capture.assert_not_called()
+    
+    def test_capture_async_not_connected(self, mock_gp):
+        """Test asynchronous capture without a connection resolves immediately."""
+        camera = Camera()
+        
+        future = camera.capture_async()
+        
+        assert future.done()
+        assert future.result().success is False
+        assert camera._executor is None
+
+
 class TestCameraInfo:
     """Test camera information retrieval."""
     
-    @patch('skycam_common.camera.gp')
     def test_get_camera_info_not_connected(self, mock_gp):
         """Test camera info when not connected."""
         camera = Camera()
@@ -395,18 +976,12 @@ class TestCameraInfo:
         assert info["port"] is None
         assert info["has_capabilities"] is False
     
-    @patch('skycam_common.camera.gp')
-    def test_get_camera_info_connected(self, mock_gp):
+    def test_get_camera_info_connected(self, mock_gp, caps):
         """Test camera info when connected."""
-        # Mock camera capabilities
         camera = Camera()
         camera.connected = True
         camera.port = "usb:/dev/ttyUSB0"
-        camera.capabilities = CameraCapabilities(
-            exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
-            apertures=[1.4, 2.0, 2.8, 4.0],
-            iso_values=["auto", "100", "200", "400", "800"]
-        )
+        camera.capabilities = caps
         
         info = camera.get_camera_info()
         
@@ -421,7 +996,6 @@ class TestCameraInfo:
 class TestCameraContextManager:
     """Test camera context manager functionality."""
     
-    @patch('skycam_common.camera.gp')
     def test_context_manager(self, mock_gp):
         """Test camera as context manager."""
         # Mock camera instance
@@ -447,6 +1021,53 @@ class TestCameraContextManager:
         assert camera.camera is None
         mock_camera_instance.exit.assert_called_once()
 
+    def test_context_manager_keep_alive(self, mock_gp):
+        """Test keep_alive cameras stay connected after the with-block."""
+        camera = Camera(port="usb:/dev/ttyUSB0")
+        camera.camera = MagicMock()
+        camera.connected = True
+        camera.keep_alive = True
+        
+        with camera:
+            pass
+        
+        assert camera.connected is True
+
+
+class TestSharedCamera:
+    """Test the process-wide shared camera."""
+    
+    @pytest.fixture(autouse=True)
+    def reset_shared(self, monkeypatch):
+        monkeypatch.setattr(camera_module, "_SHARED", None)
+    
+    def test_shared_camera_reused(self, mock_gp):
+        """Test the shared camera connects once and is reused."""
+        mock_camera_instance = MagicMock()
+        mock_camera_instance.get_config.side_effect = Exception("Config not available")
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        first = get_shared_camera(port="usb:/dev/ttyUSB0")
+        second = get_shared_camera()
+        
+        assert first is second
+        assert first.connected is True
+        assert first.keep_alive is True
+        mock_camera_instance.init.assert_called_once()
+    
+    def test_shared_camera_port_change(self, mock_gp):
+        """Test requesting a different port replaces the shared camera."""
+        mock_camera_instance = MagicMock()
+        mock_camera_instance.get_config.side_effect = Exception("Config not available")
+        mock_gp.Camera.return_value = mock_camera_instance
+        
+        first = get_shared_camera(port="usb:/dev/ttyUSB0")
+        second = get_shared_camera(port="usb:/dev/ttyUSB1")
+        
+        assert first is not second
+        assert first.connected is False
+        assert second.port == "usb:/dev/ttyUSB1"
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
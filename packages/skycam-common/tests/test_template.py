@@ -1,22 +1,26 @@
 """Tests for the template module."""
 
+import datetime
 import pytest
 import yaml
 import tempfile
 import os
+from dataclasses import fields, replace
 from pathlib import Path
-from unittest.mock import MagicMock, patch
-from unittest.mock import mock_open
+from unittest.mock import patch
 
 # Import the modules we're testing
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../src'))
-
 from skycam_common.template import Template, TemplateManager, ConfigManager
+import skycam_common.template as template_module
 from skycam_common.camera import CameraSettings, CameraCapabilities
 
 
+@pytest.fixture(autouse=True)
+def clear_template_cache():
+    """Make every test parse template files afresh."""
+    TemplateManager.clear_cache()
+
+
 class TestTemplate:
     """Test Template dataclass."""
     
@@ -100,6 +104,14 @@ class TestTemplate:
         assert settings.quality == "raw"
         assert settings.max_exposures == 0
     
+    def test_template_to_settings_keeps_zero(self):
+        """Test zero values set in a template are not replaced by defaults."""
+        settings = Template(name="burst", delay=0.0, max_exposures=0).to_settings()
+        
+        assert settings.delay == 0.0
+        assert settings.max_exposures == 0
+        assert settings.exposure == 8.0
+    
     def test_template_validate_no_capabilities(self):
         """Test template validation without camera capabilities."""
         template = Template(
@@ -144,8 +156,8 @@ class TestTemplate:
         
         warnings = template_adjust.validate(capabilities)
         assert len(warnings) == 3
-        assert "Exposure 12.0s not available" in warnings[0]
-        assert "Aperture f/2.6 not available" in warnings[1]
+        assert "Exposure 12.0s not available, closest is 15.0s" in warnings[0]
+        assert "Aperture f/2.6 not available, closest is f/2.8" in warnings[1]
         assert "ISO 600 may not be supported" in warnings[2]
     
     def test_template_validate_filename_pattern(self):
@@ -166,6 +178,9 @@ class TestTemplate:
         warnings = template_bad.validate()
         assert len(warnings) == 1
         assert "filename_pattern should include {timestamp}" in warnings[0]
+        
+        assert Template(name="t", filename_pattern="{camera}-{timestamp}").validate() == []
+        assert len(Template(name="t", filename_pattern="Sky-{timestamps}").validate()) == 1
     
     def test_template_to_dict(self):
         """Test template serialization to dictionary."""
@@ -185,6 +200,7 @@ class TestTemplate:
         assert template_dict["aperture"] == 1.4
         assert template_dict["exposure"] == 8.0
         assert template_dict["iso"] == "auto"
+        assert list(template_dict) == [f.name for f in fields(Template)]
     
     def test_template_from_dict(self):
         """Test template creation from dictionary."""
@@ -209,6 +225,15 @@ class TestTemplate:
         assert template.delay == 15.0
         assert template.quality == "raw"
         assert template.max_exposures == 25
+        assert template.filename_pattern is None
+        assert template == Template(**template_dict)
+    
+    def test_template_from_dict_invalid(self):
+        """Test from_dict rejects unknown fields and a missing name."""
+        with pytest.raises(TypeError, match="exposur"):
+            Template.from_dict({"name": "typo", "exposur": 8.0})
+        with pytest.raises(TypeError, match="name"):
+            Template.from_dict({"exposure": 8.0})
 
 
 class TestTemplateManager:
@@ -239,34 +264,105 @@ class TestTemplateManager:
         assert manager.templates_dir == Path(custom_templates)
         assert manager.default_template_path == Path(custom_templates) / "default.yml"
     
-    def test_save_template(self):
+    def test_init_config_dir_only(self, tmp_path):
+        """Test templates default to a directory under a custom config directory."""
+        manager = TemplateManager(config_dir=tmp_path)
+        
+        assert manager.templates_dir == tmp_path / "templates"
+        assert not manager.templates_dir.exists()  # Created on first save
+        assert manager.list_templates() == []
+        
+        manager.save_template(Template(name="night"))
+        assert (tmp_path / "templates" / "night.yml").exists()
+    
+    def test_save_template(self, tmp_path):
         """Test template save operations."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            manager = TemplateManager(templates_dir=tmp_dir)
-            
-            template = Template(
-                name="test-save-template",
-                description="Template for testing save/load",
-                aperture=1.8,
-                exposure=12.0,
-                iso="auto"
-            )
-            
-            # Save template
-            manager.save_template(template)
-            
-            # Verify file was created
-            template_file = Path(tmp_dir) / "test-save-template.yml"
-            assert template_file.exists()
-            
-            # Verify content
-            with open(template_file, 'r') as f:
-                content = f.read()
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        template = Template(
+            name="test-save-template",
+            description="Template for testing save/load",
+            aperture=1.8,
+            exposure=12.0,
+            iso="auto"
+        )
+        
+        # Save template
+        manager.save_template(template)
+        
+        # Verify file was created
+        template_file = tmp_path / "test-save-template.yml"
+        assert template_file.exists()
+        
+        # Verify content
+        with open(template_file, 'r') as f:
+            content = f.read()
+        
+        assert "test-save-template" in content
+        assert "Template for testing save/load" in content
+        assert "aperture: 1.8" in content
+        assert "exposure: 12.0" in content
+    
+    def test_save_template_unchanged(self, tmp_path):
+        """Test saving an unchanged template leaves the file alone."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        template_file = tmp_path / "unchanged.yml"
+        
+        manager.save_template(Template(name="unchanged", exposure=10.0))
+        os.utime(template_file, ns=(0, 0))
+        
+        manager.save_template(Template(name="unchanged", exposure=10.0))
+        assert template_file.stat().st_mtime_ns == 0
+        
+        manager.save_template(Template(name="unchanged", exposure=12.0))
+        assert template_file.stat().st_mtime_ns != 0
+        # No temp files left, only the template and its sidecar
+        assert sorted(os.listdir(tmp_path)) == ["unchanged.yml", "unchanged.yml.cache.json"]
+    
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_save_template_keeps_mode(self, tmp_path):
+        """Test saving keeps an existing file's mode and uses the umask for new files."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        template_file = tmp_path / "modes.yml"
+        old_umask = os.umask(0o022)
+        try:
+            manager.save_template(Template(name="modes", exposure=10.0))
+            assert template_file.stat().st_mode & 0o777 == 0o644
             
-            assert "test-save-template" in content
-            assert "Template for testing save/load" in content
-            assert "aperture: 1.8" in content
-            assert "exposure: 12.0" in content
+            template_file.chmod(0o640)
+            manager.save_template(Template(name="modes", exposure=12.0))
+            assert template_file.stat().st_mode & 0o777 == 0o640
+        finally:
+            os.umask(old_umask)
+    
+    def test_save_template_keeps_symlink(self, tmp_path):
+        """Test saving a symlinked template rewrites its target and keeps the link."""
+        target_dir = tmp_path / "shared"
+        target_dir.mkdir()
+        (target_dir / "linked.yml").write_text("exposure: 10.0\n")
+        templates_dir = tmp_path / "templates"
+        templates_dir.mkdir()
+        (templates_dir / "linked.yml").symlink_to(target_dir / "linked.yml")
+        manager = TemplateManager(templates_dir=templates_dir)
+        
+        manager.save_template(Template(name="linked", exposure=12.0))
+        
+        assert (templates_dir / "linked.yml").is_symlink()
+        assert yaml.safe_load((target_dir / "linked.yml").read_text())["exposure"] == 12.0
+    
+    def test_save_template_seeds_cache(self, tmp_path):
+        """Test a saved template loads back without parsing, in this process or the next."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        with patch.object(yaml, 'load', wraps=yaml.load) as mock_load:
+            assert manager.get_template("default").exposure == 8.0  # Created
+            manager.save_template(Template(name="night", exposure=20.0))
+            assert manager.load_template("night").exposure == 20.0
+            
+            TemplateManager.clear_cache()
+            assert manager.load_template("night").exposure == 20.0  # From the sidecar
+            assert manager.load_template("default").exposure == 8.0
+            mock_load.assert_not_called()
     
     def test_load_template_not_found(self):
         """Test loading non-existent template."""
@@ -275,8 +371,21 @@ class TestTemplateManager:
         with pytest.raises(FileNotFoundError, match="Template 'nonexistent' not found"):
             manager.load_template("nonexistent")
     
-    def test_load_template_file_path(self):
-        """Test loading template from file path."""
+    def test_load_template_name_not_treated_as_path(self, tmp_path, monkeypatch):
+        """Test a bare name is looked up in the templates directory, not the working directory."""
+        templates_dir = tmp_path / "templates"
+        templates_dir.mkdir()
+        (templates_dir / "night.yml").write_text("exposure: 20.0\n")
+        (tmp_path / "night").write_text("exposure: 1.0\n")
+        monkeypatch.chdir(tmp_path)
+        manager = TemplateManager(templates_dir=templates_dir)
+        
+        with patch.object(os.path, 'exists', wraps=os.path.exists) as mock_exists:
+            assert manager.load_template("night").exposure == 20.0
+            mock_exists.assert_not_called()
+    
+    def test_load_template_file_path(self, tmp_path):
+        """Test loading template from file path, leaving its directory untouched."""
         template_content = {
             "name": "file-template",
             "description": "Loaded from file",
@@ -284,21 +393,78 @@ class TestTemplateManager:
             "exposure": 10.0
         }
         
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yml', delete=False) as tmp_file:
-            yaml.dump(template_content, tmp_file)
-            tmp_file_path = tmp_file.name
+        shared_dir = tmp_path / "shared"
+        shared_dir.mkdir()
+        template_file = shared_dir / "file-template.yml"
+        with open(template_file, 'w') as f:
+            yaml.dump(template_content, f)
         
-        try:
-            manager = TemplateManager()
-            template = manager.load_template(tmp_file_path)
-            
-            assert template.name == "file-template"
-            assert template.description == "Loaded from file"
-            assert template.aperture == 2.0
-            assert template.exposure == 10.0
-        finally:
-            os.unlink(tmp_file_path)
+        manager = TemplateManager(templates_dir=tmp_path / "templates")
+        template = manager.load_template(str(template_file))
+        
+        assert template.name == "file-template"
+        assert template.description == "Loaded from file"
+        assert template.aperture == 2.0
+        assert template.exposure == 10.0
+        assert manager.load_description(str(template_file)) == "Loaded from file"
+        
+        # No sidecar is written outside the templates directory
+        assert os.listdir(shared_dir) == ["file-template.yml"]
+    
+    def test_load_template_cached(self, tmp_path):
+        """Test an unchanged template file is only parsed once."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        template_file = tmp_path / "cached.yml"
+        template_file.write_text("exposure: 10.0\n")
+        
+        with patch.object(yaml, 'load', wraps=yaml.load) as mock_load:
+            first = manager.load_template("cached")
+            first.exposure = 99.0
+            second = manager.load_template("cached")
+            
+            assert mock_load.call_count == 1
+            assert second.exposure == 10.0  # Callers get their own copy
+            
+            # Rewriting the file invalidates the cached entry
+            template_file.write_text("exposure: 20.0\ndelay: 5.0\n")
+            assert manager.load_template("cached").exposure == 20.0
+            assert mock_load.call_count == 2
+    
+    def test_template_cache_bounded(self, tmp_path, monkeypatch):
+        """Test the parsed template cache evicts the least recently used entry."""
+        monkeypatch.setattr(template_module, "_TEMPLATE_CACHE_SIZE", 2)
+        manager = TemplateManager(templates_dir=tmp_path)
+        for name in ("a", "b", "c"):
+            manager.save_template(Template(name=name))
+        
+        manager.load_template("a")
+        manager.load_template("b")
+        manager.load_template("a")  # Now more recent than b
+        manager.load_template("c")
+        
+        cached = {os.path.basename(path) for path, _, _ in template_module._TEMPLATE_CACHE}
+        assert cached == {"a.yml", "c.yml"}
+    
+    def test_load_template_json_sidecar(self, tmp_path):
+        """Test a parsed template is reused from its JSON sidecar until the YAML changes."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        template_file = tmp_path / "sidecar.yml"
+        template_file.write_text("exposure: 10.0\n")
+        manager.load_template("sidecar")
+        
+        assert (tmp_path / "sidecar.yml.cache.json").exists()
+        assert manager.list_templates() == ["sidecar"]
+        
+        # A new process has an empty in-memory cache
+        TemplateManager.clear_cache()
+        with patch.object(yaml, 'load', wraps=yaml.load) as mock_load:
+            assert manager.load_template("sidecar").exposure == 10.0
+            mock_load.assert_not_called()
+            
+            template_file.write_text("exposure: 25.0\ndelay: 5.0\n")
+            TemplateManager.clear_cache()
+            assert manager.load_template("sidecar").exposure == 25.0
+            mock_load.assert_called_once()
     
     def test_load_template_invalid_yaml(self):
         """Test loading template with invalid YAML."""
@@ -314,145 +480,260 @@ class TestTemplateManager:
         finally:
             os.unlink(tmp_file_path)
     
-    def test_list_templates_empty(self):
+    def test_list_templates_empty(self, tmp_path):
         """Test listing templates when directory is empty."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            manager = TemplateManager(templates_dir=tmp_dir)
-            templates = manager.list_templates()
-            
-            assert templates == []
+        manager = TemplateManager(templates_dir=tmp_path)
+        templates = manager.list_templates()
+        
+        assert templates == []
     
-    def test_list_templates_with_files(self):
+    def test_list_templates_with_files(self, tmp_path):
         """Test listing templates with actual files."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            # Create some template files
-            template1 = Path(tmp_dir) / "template1.yml"
-            template2 = Path(tmp_dir) / "template2.yml"
-            
-            template1.write_text("name: template1")
-            template2.write_text("name: template2")
-            
-            # Also create a non-template file
-            non_template = Path(tmp_dir) / "readme.txt"
-            non_template.write_text("This is not a template")
-            
-            manager = TemplateManager(templates_dir=tmp_dir)
-            templates = manager.list_templates()
-            
-            assert sorted(templates) == ["template1", "template2"]
+        # Create some template files
+        template1 = tmp_path / "template1.yml"
+        template2 = tmp_path / "template2.yml"
+        
+        template1.write_text("name: template1")
+        template2.write_text("name: template2")
+        
+        # Also create a non-template file
+        non_template = tmp_path / "readme.txt"
+        non_template.write_text("This is not a template")
+        
+        manager = TemplateManager(templates_dir=tmp_path)
+        templates = manager.list_templates()
+        
+        assert sorted(templates) == ["template1", "template2"]
+        assert list(manager.iter_templates()) == [
+            ("template1", str(template1)),
+            ("template2", str(template2)),
+        ]
+    
+    def test_load_description(self, tmp_path):
+        """Test descriptions come from the cache or sidecar without building a Template."""
+        (tmp_path / "night.yml").write_text("description: Dark skies\nexposure: 10.0\n")
+        (tmp_path / "plain.toml").write_text("exposure = 5.0\n")
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        assert manager.load_description("night") == "Dark skies"
+        assert manager.load_description("plain") is None
+        
+        with patch.object(Template, 'from_dict', wraps=Template.from_dict) as mock_from_dict:
+            assert manager.load_description("night") == "Dark skies"
+            TemplateManager.clear_cache()
+            assert manager.load_description("night") == "Dark skies"  # From the sidecar
+        mock_from_dict.assert_not_called()
+        
+        with pytest.raises(FileNotFoundError):
+            manager.load_description("missing")
+    
+    def test_load_toml_template(self, tmp_path):
+        """Test TOML templates load by name and take precedence over YAML."""
+        (tmp_path / "night.yml").write_text("exposure: 10.0\n")
+        (tmp_path / "night.toml").write_text('exposure = 20.0\niso = "800"\n')
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        template = manager.load_template("night")
+        
+        assert template.name == "night"
+        assert template.exposure == 20.0
+        assert template.iso == "800"
+        assert list(manager.iter_templates()) == [("night", str(tmp_path / "night.toml"))]
+    
+    def test_load_toml_template_invalid(self, tmp_path):
+        """Test loading a template with invalid TOML."""
+        (tmp_path / "broken.toml").write_text("exposure = = 1")
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        with pytest.raises(ValueError, match="Invalid TOML"):
+            manager.load_template("broken")
+    
+    def test_migrate_to_toml(self, tmp_path):
+        """Test YAML templates are rewritten as TOML and the YAML removed."""
+        manager = TemplateManager(templates_dir=tmp_path)
+        original = Template(name="moon", description='Say "cheese"', exposure=0.5,
+                            iso="100", temperature_monitoring=True)
+        manager.save_template(original)
+        manager.load_template("moon")  # Leaves a JSON sidecar behind
+        
+        assert manager.migrate_to_toml() == ["moon"]
+        assert sorted(os.listdir(tmp_path)) == ["moon.toml"]
+        assert manager.load_template("moon") == original
+        assert manager.migrate_to_toml() == []
+        
+        # Further saves keep the template in TOML
+        manager.save_template(replace(original, exposure=15.0))
+        assert sorted(os.listdir(tmp_path)) == ["moon.toml"]
+        assert manager.load_template("moon").exposure == 15.0
+    
+    def test_migrate_to_toml_dates(self, tmp_path):
+        """Test YAML dates are written as TOML date literals."""
+        (tmp_path / "dated.yml").write_text("description: 2024-01-01\nexposure: 1.0\n")
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        assert manager.migrate_to_toml() == ["dated"]
+        assert manager.load_template("dated").description == datetime.date(2024, 1, 1)
+    
+    def test_migrate_to_toml_all_or_nothing(self, tmp_path):
+        """Test no template is migrated when one of them fails to convert."""
+        (tmp_path / "a.yml").write_text("exposure: 1.0\n")
+        (tmp_path / "b.yml").write_text("exposure: [1.0\n")
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        with pytest.raises(ValueError):
+            manager.migrate_to_toml()
+        assert not list(tmp_path.glob("*.toml"))
+        assert (tmp_path / "a.yml").exists()
+    
+    def test_list_templates_cached(self, tmp_path):
+        """Test the listing is reused until the directory changes or a template is saved."""
+        (tmp_path / "a.yml").write_text("exposure: 1.0\n")
+        os.utime(tmp_path, ns=(1, 1))
+        manager = TemplateManager(templates_dir=tmp_path)
+        
+        with patch.object(os, 'scandir', wraps=os.scandir) as mock_scandir:
+            assert manager.list_templates() == ["a"]
+            assert manager.list_templates() == ["a"]
+            assert mock_scandir.call_count == 1
+            
+            (tmp_path / "b.yml").write_text("exposure: 2.0\n")
+            os.utime(tmp_path, ns=(2, 2))
+            assert manager.list_templates() == ["a", "b"]
+            assert mock_scandir.call_count == 2
+            
+            # A save is seen even within the same timestamp tick
+            manager.save_template(Template(name="c"))
+            os.utime(tmp_path, ns=(2, 2))
+            assert manager.list_templates() == ["a", "b", "c"]
+            assert mock_scandir.call_count == 3
+    
+    def test_list_templates_relative_dir_after_chdir(self, tmp_path, monkeypatch):
+        """Test listings of a relative templates directory follow the working directory."""
+        for site, name in (("a", "moon"), ("b", "stars")):
+            (tmp_path / site / "templates").mkdir(parents=True)
+            (tmp_path / site / "templates" / f"{name}.yml").write_text("exposure: 1.0\n")
+            os.utime(tmp_path / site / "templates", ns=(1, 1))
+        
+        monkeypatch.chdir(tmp_path / "a")
+        assert TemplateManager(templates_dir="templates").list_templates() == ["moon"]
+        
+        monkeypatch.chdir(tmp_path / "b")
+        manager = TemplateManager(templates_dir="templates")
+        assert manager.list_templates() == ["stars"]
+        assert manager.load_template("stars").name == "stars"
+    
+    def test_resolve_uses_listing(self, tmp_path):
+        """Test a listed YAML template is loaded without trying the TOML name first."""
+        (tmp_path / "a.yml").write_text("exposure: 1.0\n")
+        manager = TemplateManager(templates_dir=tmp_path)
+        assert manager.list_templates() == ["a"]
+        
+        with patch.object(os, 'stat', wraps=os.stat) as mock_stat:
+            assert manager.load_template("a").exposure == 1.0
+        
+        stat_paths = [os.fspath(call.args[0]) for call in mock_stat.call_args_list]
+        assert str(tmp_path / "a.toml") not in stat_paths
     
-    def test_create_default_template(self):
+    def test_create_default_template(self, tmp_path):
         """Test creating default template."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            default_template = manager.create_default_template()
-            
-            assert default_template.name == "default"
-            assert default_template.description == "Default skycam template for general astrophotography"
-            assert default_template.aperture == 1.4
-            assert default_template.exposure == 8.0
-            assert default_template.iso == "auto"
-            assert default_template.delay == 12.0
-            assert default_template.quality == "raw"
-            assert default_template.max_exposures == 0
-            
-            # Verify file was created
-            assert (tmp_path / "default.yml").exists()
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        default_template = manager.create_default_template()
+        
+        assert default_template.name == "default"
+        assert default_template.description == "Default skycam template for general astrophotography"
+        assert default_template.aperture == 1.4
+        assert default_template.exposure == 8.0
+        assert default_template.iso == "auto"
+        assert default_template.delay == 12.0
+        assert default_template.quality == "raw"
+        assert default_template.max_exposures == 0
+        
+        # Verify file was created
+        assert (tmp_path / "default.yml").exists()
     
-    def test_ensure_default_template_exists(self):
+    def test_ensure_default_template_exists(self, tmp_path):
         """Test ensuring default template exists when it doesn't."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            
-            # File doesn't exist initially
-            assert not (tmp_path / "default.yml").exists()
-            
-            manager.ensure_default_template()
-            
-            # File should now exist
-            assert (tmp_path / "default.yml").exists()
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        
+        # File doesn't exist initially
+        assert not (tmp_path / "default.yml").exists()
+        
+        manager.ensure_default_template()
+        
+        # File should now exist
+        assert (tmp_path / "default.yml").exists()
     
-    def test_ensure_default_template_already_exists(self):
+    def test_ensure_default_template_already_exists(self, tmp_path):
         """Test ensuring default template when it already exists."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            
-            # Create existing template
-            existing_template = Template(name="default", exposure=5.0)
-            manager.save_template(existing_template)
-            
-            # Ensure it exists (should not overwrite)
-            manager.ensure_default_template()
-            
-            # Load and verify it wasn't overwritten
-            template = manager.load_template("default")
-            assert template.exposure == 5.0  # Original value preserved
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        
+        # Create existing template
+        existing_template = Template(name="default", exposure=5.0)
+        manager.save_template(existing_template)
+        
+        # Ensure it exists (should not overwrite)
+        manager.ensure_default_template()
+        
+        # Load and verify it wasn't overwritten
+        template = manager.load_template("default")
+        assert template.exposure == 5.0  # Original value preserved
     
-    def test_get_template_existing(self):
+    def test_get_template_existing(self, tmp_path):
         """Test getting existing template."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            
-            # Create a template
-            original_template = Template(
-                name="existing-template",
-                description="Already exists",
-                aperture=2.8,
-                exposure=15.0
-            )
-            manager.save_template(original_template)
-            
-            # Get the template
-            retrieved_template = manager.get_template("existing-template")
-            
-            assert retrieved_template.name == "existing-template"
-            assert retrieved_template.description == "Already exists"
-            assert retrieved_template.aperture == 2.8
-            assert retrieved_template.exposure == 15.0
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        
+        # Create a template
+        original_template = Template(
+            name="existing-template",
+            description="Already exists",
+            aperture=2.8,
+            exposure=15.0
+        )
+        manager.save_template(original_template)
+        
+        # Get the template
+        retrieved_template = manager.get_template("existing-template")
+        
+        assert retrieved_template.name == "existing-template"
+        assert retrieved_template.description == "Already exists"
+        assert retrieved_template.aperture == 2.8
+        assert retrieved_template.exposure == 15.0
     
-    def test_get_template_default_creates(self):
+    def test_get_template_default_creates(self, tmp_path):
         """Test getting default template creates it if missing."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            
-            # Don't create default template
-            assert not (tmp_path / "default.yml").exists()
-            
-            # Get default template (should create it)
-            default_template = manager.get_template("default")
-            
-            assert default_template.name == "default"
-            assert (tmp_path / "default.yml").exists()
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        
+        # Don't create default template
+        assert not (tmp_path / "default.yml").exists()
+        
+        # Get default template (should create it)
+        default_template = manager.get_template("default")
+        
+        assert default_template.name == "default"
+        assert (tmp_path / "default.yml").exists()
     
-    def test_validate_template(self):
+    def test_validate_template(self, tmp_path):
         """Test template validation."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            tmp_path = Path(tmp_dir)
-            manager = TemplateManager(templates_dir=str(tmp_path))
-            
-            # Create a template with missing name
-            template = Template(
-                name="",  # Invalid - empty name
-                aperture=2.8,
-                exposure=15.0
-            )
-            
-            capabilities = CameraCapabilities(
-                exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
-                apertures=[1.4, 2.0, 2.8, 4.0],
-                iso_values=["auto", "100", "200", "400", "800"]
-            )
-            
-            warnings = manager.validate_template(template, capabilities)
-            
-            # Should have warnings for empty name
-            assert len(warnings) >= 1
-            assert any("Template name is required" in w for w in warnings)
+        manager = TemplateManager(templates_dir=str(tmp_path))
+        
+        # Create a template with missing name
+        template = Template(
+            name="",  # Invalid - empty name
+            aperture=2.8,
+            exposure=15.0
+        )
+        
+        capabilities = CameraCapabilities(
+            exposure_times=[0.5, 1.0, 2.0, 4.0, 8.0, 15.0],
+            apertures=[1.4, 2.0, 2.8, 4.0],
+            iso_values=["auto", "100", "200", "400", "800"]
+        )
+        
+        warnings = manager.validate_template(template, capabilities)
+        
+        # Should have warnings for empty name
+        assert len(warnings) >= 1
+        assert any("Template name is required" in w for w in warnings)
 
 
 class TestConfigManager:
@@ -477,52 +758,135 @@ class TestConfigManager:
         assert manager.config_dir == Path(custom_config_dir)
         assert manager.config_file == Path(custom_config_dir) / "config.yml"
     
-    def test_load_config_new_file(self):
+    def test_load_config_new_file(self, tmp_path):
         """Test loading config when file doesn't exist (creates default)."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            manager = ConfigManager(config_dir=tmp_dir)
-            
-            # File doesn't exist
-            config_file = Path(tmp_dir) / "config.yml"
-            assert not config_file.exists()
-            
-            # Load config (should create default)
-            config = manager.load_config()
-            
-            # Verify default config structure
-            assert config["default_template"] == "default"
-            assert "templates_directory" in config
-            assert "output_directory" in config
-            assert "filename_pattern" in config
-            assert "timestamp_format" in config
-            assert "auto_detect_camera" in config
-            
-            # Verify file was created
-            assert config_file.exists()
+        manager = ConfigManager(config_dir=tmp_path)
+        
+        # File doesn't exist
+        config_file = tmp_path / "config.yml"
+        assert not config_file.exists()
+        
+        # Load config (should create default)
+        config = manager.load_config()
+        
+        # Verify default config structure
+        assert config["default_template"] == "default"
+        assert "templates_directory" in config
+        assert "output_directory" in config
+        assert "filename_pattern" in config
+        assert "timestamp_format" in config
+        assert "auto_detect_camera" in config
+        
+        # Verify file was created
+        assert config_file.exists()
     
-    def test_load_config_existing_file(self):
+    def test_load_config_existing_file(self, tmp_path):
         """Test loading config from existing file."""
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            config_file = Path(tmp_dir) / "config.yml"
-            
-            # Create custom config
-            custom_config = {
-                "default_template": "custom",
-                "output_directory": "/custom/output",
-                "auto_detect_camera": False
-            }
-            
-            with open(config_file, 'w') as f:
-                yaml.dump(custom_config, f)
-            
-            manager = ConfigManager(config_dir=tmp_dir)
+        config_file = tmp_path / "config.yml"
+        
+        # Create custom config
+        custom_config = {
+            "default_template": "custom",
+            "output_directory": "/custom/output",
+            "auto_detect_camera": False
+        }
+        
+        with open(config_file, 'w') as f:
+            yaml.dump(custom_config, f)
+        
+        manager = ConfigManager(config_dir=tmp_path)
+        config = manager.load_config()
+        
+        # Should load custom values
+        assert config["default_template"] == "custom"
+        assert config["output_directory"] == "/custom/output"
+        assert config["auto_detect_camera"] is False
+        
+        # Should merge with defaults for missing keys
+        assert "templates_directory" in config
+        assert "filename_pattern"
+    
+    def test_load_config_invalid_yaml(self, tmp_path, caplog):
+        """Test an invalid config file is logged and replaced with the defaults."""
+        (tmp_path / "config.yml").write_text("default_template: [night\n")
+        manager = ConfigManager(config_dir=tmp_path)
+        
+        with caplog.at_level("WARNING", logger="skycam_common.template"):
             config = manager.load_config()
-            
-            # Should load custom values
-            assert config["default_template"] == "custom"
-            assert config["output_directory"] == "/custom/output"
-            assert config["auto_detect_camera"] is False
-            
-            # Should merge with defaults for missing keys
-            assert "templates_directory" in config
-            assert "filename_pattern"
+        
+        assert config["default_template"] == "default"
+        assert "Invalid config file" in caplog.text
+    
+    def test_load_config_cached(self, tmp_path):
+        """Test an unchanged config file is parsed once and re-read after it changes."""
+        manager = ConfigManager(config_dir=tmp_path)
+        manager.save_config({"default_template": "night"})
+        
+        with patch.object(yaml, 'load', wraps=yaml.load) as mock_load:
+            first = manager.load_config()
+            first["default_template"] = "modified"
+            assert manager.load_config()["default_template"] == "night"
+            assert mock_load.call_count == 1
+            
+            manager.save_config({"default_template": "aurora"})
+            assert manager.load_config()["default_template"] == "aurora"
+            assert mock_load.call_count == 2
+    
+    def test_config_dir_created_on_save(self, tmp_path):
+        """Test the config directory is only created when the config is first written."""
+        config_dir = tmp_path / "nested" / "skycam"
+        manager = ConfigManager(config_dir=config_dir)
+        
+        assert not config_dir.exists()
+        
+        manager.load_config()  # Writes the defaults
+        assert (config_dir / "config.yml").exists()
+    
+    def test_save_config_atomic(self, tmp_path):
+        """Test saving config replaces the file in one piece and leaves no temp files."""
+        manager = ConfigManager(config_dir=tmp_path)
+        manager.save_config({"default_template": "night"})
+        manager.save_config({"default_template": "aurora", "max_retries": 5})
+        
+        assert os.listdir(tmp_path) == ["config.yml"]
+        with open(tmp_path / "config.yml") as f:
+            assert yaml.safe_load(f) == {"default_template": "aurora", "max_retries": 5}
+    
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_save_config_keeps_mode(self, tmp_path):
+        """Test saving config doesn't narrow the config file's permissions."""
+        manager = ConfigManager(config_dir=tmp_path)
+        config_file = tmp_path / "config.yml"
+        config_file.write_text("default_template: night\n")
+        config_file.chmod(0o644)
+        
+        manager.save_config({"default_template": "aurora"})
+        
+        assert config_file.stat().st_mode & 0o777 == 0o644
+    
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_save_config_new_file_umask(self, tmp_path):
+        """Test a new config file gets the mode the umask allows."""
+        manager = ConfigManager(config_dir=tmp_path)
+        old_umask = os.umask(0o027)
+        try:
+            manager.save_config({"default_template": "night"})
+        finally:
+            os.umask(old_umask)
+        
+        assert (tmp_path / "config.yml").stat().st_mode & 0o777 == 0o640
+    
+    def test_save_config_keeps_symlink(self, tmp_path):
+        """Test saving a symlinked config file rewrites its target."""
+        dotfiles = tmp_path / "dotfiles"
+        dotfiles.mkdir()
+        (dotfiles / "config.yml").write_text("default_template: night\n")
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        (config_dir / "config.yml").symlink_to(dotfiles / "config.yml")
+        manager = ConfigManager(config_dir=config_dir)
+        
+        manager.save_config({"default_template": "aurora"})
+        
+        assert (config_dir / "config.yml").is_symlink()
+        assert yaml.safe_load((dotfiles / "config.yml").read_text()) == {"default_template": "aurora"}
\ No newline at end of file